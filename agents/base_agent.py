@@ -1,52 +1,357 @@
+import asyncio
 import json
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
-from langchain.callbacks.base import Callbacks
-from langchain_google_genai import ChatGoogleGenerativeAI
-
-# Create a tiny dummy BaseCache class so Pydantic finds it.
-# This is harmless — you are not enabling any cache behavior.
-class _DummyBaseCache:
-    pass
-
-# Attach it and rebuild the model
-ChatGoogleGenerativeAI.BaseCache = _DummyBaseCache
-ChatGoogleGenerativeAI.model_rebuild()
-def get_llm():
-    from dotenv import load_dotenv
-    import os
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError("Missing GOOGLE_API_KEY environment variable.")
-    return ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.0)
+import threading
+from functools import lru_cache
 
+MODEL_NAME = "gemini-2.0-flash"
 
-def create_agent(category_name, weight, rubric_desc):
-    prompt = ChatPromptTemplate.from_template("""
+# Label of the single-call agent that scores every category (combined mode)
+COMBINED_LABEL = "All categories"
+
+# Bump when rubric wording or scoring rules change so cached results are not reused
+RUBRIC_VERSION = "1"
+
+PROMPT_TEMPLATE = """
         You are an expert hackathon evaluator responsible for the category: **{category_name}**
-        
+
         Evaluate ONLY this category for the provided GitHub repository content.
-        
+
         Criteria Description:
         {rubric_desc}
-        
+
         Return ONLY valid JSON, nothing else, like this:
-        
+
             {{
               "category": "<category_name>",
               "score": <integer between 0 and max_weight>,
               "feedback": "<your brief feedback with code citations>"
             }}
-            
-            Must follow Notes: 
+
+            Must follow Notes:
             1. Do NOT include any extra text, explanation
             2. Don't return in markdown format
             3. Valid json so that json.loads work
-        
+
         Repository content:
         {repo_content}
-        """.replace('{category_name}',category_name).replace('{rubric_desc}',rubric_desc).replace('{weight}',str(weight)))
+        """
+
+COMBINED_PROMPT_TEMPLATE = """
+        You are an expert hackathon evaluator. Evaluate the provided GitHub repository content
+        in EACH of the categories below. Score every category independently, using ONLY
+        that category's criteria.
+
+        {rubric_sections}
+
+        Return ONLY valid JSON, nothing else, with one entry per category key, like this:
+
+            {{
+              "<category key>": {{
+                "category": "<category key>",
+                "score": <integer between 0 and that category's max score>,
+                "feedback": "<your brief feedback with code citations>"
+              }}
+            }}
+
+            Must follow Notes:
+            1. Include every category key listed above
+            2. Do NOT include any extra text, explanation
+            3. Don't return in markdown format
+            4. Valid json so that json.loads work
+
+        Repository content:
+        {repo_content}
+        """
+
+
+@lru_cache(maxsize=1)
+def _langchain():
+    """
+    Import langchain on first use rather than at import time: it takes over a
+    second and the API, /health and the batch workers don't need it to boot.
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain.chains import LLMChain
+    from langchain.callbacks.base import Callbacks  # noqa: F401 - resolved by model_rebuild() below
+
+    # Create a tiny dummy BaseCache class so Pydantic finds it.
+    # This is harmless — you are not enabling any cache behavior.
+    # (Responses are cached by run_agent via utils.llm_cache instead.)
+    class _DummyBaseCache:
+        pass
+
+    # Attach it and rebuild the model
+    ChatGoogleGenerativeAI.BaseCache = _DummyBaseCache
+    ChatGoogleGenerativeAI.model_rebuild()
+    return ChatGoogleGenerativeAI, ChatPromptTemplate, LLMChain
+
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """The Gemini client, created once and shared (with its connection pool) by every chain."""
+    from utils.config import load_env
+    import os
+    load_env()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing GOOGLE_API_KEY environment variable.")
+    ChatGoogleGenerativeAI, _, _ = _langchain()
+    return ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.0)
+
+
+def create_agent(category_name, weight, rubric_desc):
+    _, ChatPromptTemplate, LLMChain = _langchain()
+    prompt = ChatPromptTemplate.from_template(
+        PROMPT_TEMPLATE.replace('{category_name}',category_name).replace('{rubric_desc}',rubric_desc).replace('{weight}',str(weight))
+    )
+
+    return LLMChain(llm=get_llm(), prompt=prompt)
+
+
+def build_rubric_sections(categories):
+    """categories: {key: (category_name, weight, rubric_desc)} -> one rubric block per category."""
+    sections = []
+    for key, (category_name, weight, rubric_desc) in categories.items():
+        sections.append(
+            f"### Key: \"{key}\" — {category_name} (score between 0 and {weight})\n"
+            f"        {rubric_desc}"
+        )
+    return "\n\n        ".join(sections)
+
+
+def create_combined_agent(categories):
+    """
+    One chain that scores all categories at once, so the repository content is
+    sent (and paid for) a single time instead of once per category.
+
+    Args:
+        categories (dict): key -> (category_name, weight, rubric_desc)
+    """
+    _, ChatPromptTemplate, LLMChain = _langchain()
+    prompt = ChatPromptTemplate.from_template(
+        COMBINED_PROMPT_TEMPLATE.replace('{rubric_sections}', build_rubric_sections(categories))
+    )
 
     return LLMChain(llm=get_llm(), prompt=prompt)
+
+
+# Chains are stateless, so each one is built once and shared by every evaluation
+_agents = {}
+_agents_lock = threading.Lock()
+
+
+def get_agent(label, build):
+    """The chain registered under `label`, built with build() the first time it is needed."""
+    with _agents_lock:
+        if label not in _agents:
+            _agents[label] = build()
+        return _agents[label]
+
+
+def register_agent(label, agent):
+    """Use `agent` for `label` from now on (e.g. a stand-in chain for offline benchmarks)."""
+    with _agents_lock:
+        _agents[label] = agent
+
+
+def build_agents(categories):
+    """
+    Build every category chain plus the combined one up front (called at API
+    startup) so the first evaluation doesn't pay for it.
+
+    Args:
+        categories (dict): key -> (category_name, weight, rubric_desc)
+    """
+    for category_name, weight, rubric_desc in categories.values():
+        get_agent(category_name, lambda: create_agent(category_name, weight, rubric_desc))
+    get_agent(COMBINED_LABEL, lambda: create_combined_agent(categories))
+    return len(_agents)
+
+
+def parse_agent_output(res):
+    """Parse an agent's JSON answer, tolerating a ```json fence around it."""
+    clean_str = res.strip().lstrip("```json").rstrip("```").strip()
+    return json.loads(clean_str)
+
+
+def check_agent_output(data, weight):
+    """
+    Validate one category's parsed answer: it must be a JSON object with a
+    numeric score. Returns a copy whose score is an int clamped to 0..weight.
+
+    Raises:
+        ValueError: the answer does not have that shape
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    try:
+        score = int(float(data.get("score")))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Invalid score: {data.get('score')!r}")
+    return {**data, "score": max(0, min(weight, score))}
+
+
+def check_combined_output(data, categories):
+    """
+    Validate a combined answer: a JSON object holding a valid answer (see
+    check_agent_output) for every key in categories. Returns the checked answers by key.
+
+    Raises:
+        ValueError: the answer does not have that shape or misses a category
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    checked = {}
+    for key, (_, weight, _) in categories.items():
+        if key not in data:
+            raise ValueError(f"Category missing from combined response: {key}")
+        checked[key] = check_agent_output(data[key], weight)
+    return checked
+
+
+@lru_cache(maxsize=1)
+def _usage_handler_class():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UsageHandler(BaseCallbackHandler):
+        """Collects the token usage Gemini reports for one chain call."""
+
+        def __init__(self):
+            self.input_tokens = None
+            self.output_tokens = None
+
+        def on_llm_end(self, response, **kwargs):
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        self.input_tokens = (self.input_tokens or 0) + usage.get("input_tokens", 0)
+                        self.output_tokens = (self.output_tokens or 0) + usage.get("output_tokens", 0)
+
+    return UsageHandler
+
+
+async def _run_with_rate_limit(agent, repo_content, category_name, callbacks=None):
+    """Call the chain through the shared LLM rate limiter, backing off and retrying on 429."""
+    import os
+    from utils import metrics
+    from utils.rate_limiter import get_llm_rate_limiter, is_rate_limit_error
+
+    limiter = get_llm_rate_limiter()
+    max_retries = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    for attempt in range(max_retries + 1):
+        await limiter.acquire_async()
+        try:
+            result = await agent.ainvoke({"repo_content": repo_content}, config={"callbacks": callbacks or []})
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == max_retries:
+                raise
+            delay = limiter.backoff()
+            metrics.LLM_RETRIES.inc(agent=category_name)
+            entry = metrics.agent_breakdown(category_name)
+            if entry is not None:
+                entry["retries"] += 1
+            print(f"⏳ Rate limited on {category_name}, backing off {delay:.0f}s")
+            continue
+        limiter.success()
+        return result[agent.output_key]
+
+
+async def _call_agent(agent, repo_content, label):
+    """Run the agent and record its latency and token usage (see utils.metrics)."""
+    from utils import metrics
+
+    usage = _usage_handler_class()()
+    with metrics.timed(metrics.LLM_SECONDS, agent=label) as elapsed:
+        output = await _run_with_rate_limit(agent, repo_content, label, callbacks=[usage])
+
+    input_tokens, output_tokens = usage.input_tokens, usage.output_tokens
+    if input_tokens is None:
+        # The model did not report usage; estimate it with the packer's tokenizer
+        from utils.content_packer import count_tokens
+        input_tokens, output_tokens = await asyncio.to_thread(
+            lambda: (count_tokens(repo_content), count_tokens(output))
+        )
+    metrics.LLM_INPUT_TOKENS.inc(input_tokens, agent=label)
+    metrics.LLM_OUTPUT_TOKENS.inc(output_tokens, agent=label)
+    entry = metrics.agent_breakdown(label)
+    if entry is not None:
+        entry.update(seconds=round(elapsed["seconds"], 4), input_tokens=input_tokens, output_tokens=output_tokens)
+    return output
+
+
+async def _run_cached(label, rubric_desc, prompt_template, build_agent, repo_content, use_cache, check):
+    """
+    Answer from the local LLM cache when the exact same prompt was seen before,
+    otherwise call the registered agent and remember the answer.
+
+    check(output) must raise ValueError for answers the orchestrator cannot use;
+    those are never cached, and such a cached answer is ignored.
+    """
+    from utils import metrics
+    from utils.llm_cache import get_llm_cache, make_cache_key
+
+    cache = get_llm_cache()
+    # Never remember answers about a repo that could not be fetched
+    if repo_content.startswith("Error fetching repo:"):
+        cache = None
+    key = make_cache_key(MODEL_NAME, label, rubric_desc, RUBRIC_VERSION, prompt_template, repo_content)
+    if cache and use_cache:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None and not _is_valid(cached, check):
+            cached = None
+        if cached is not None:
+            print(f"💾 Cache hit for {label}")
+            metrics.LLM_CACHE_HITS.inc(agent=label)
+            entry = metrics.agent_breakdown(label)
+            if entry is not None:
+                entry["cached"] = True
+            return cached
+
+    # Building a chain the first time imports langchain; keep that off the event loop
+    agent = await asyncio.to_thread(get_agent, label, build_agent)
+    output = await _call_agent(agent, repo_content, label)
+
+    # Only keep answers the orchestrator can use
+    if cache and _is_valid(output, check):
+        await asyncio.to_thread(cache.put, key, output, model=MODEL_NAME, category=label)
+    return output
+
+
+def _is_valid(output, check):
+    try:
+        check(output)
+        return True
+    except ValueError:
+        return False
+
+
+async def run_agent(category_name, weight, rubric_desc, repo_content, use_cache=True):
+    """
+    Run one category agent on the repository content.
+
+    Identical inputs (model, rubric, prompt, content) are answered from the local
+    LLM cache. With use_cache=False the cache is not read, but the fresh answer
+    still replaces the stored one.
+    """
+    return await _run_cached(
+        category_name, rubric_desc, PROMPT_TEMPLATE,
+        lambda: create_agent(category_name, weight, rubric_desc),
+        repo_content, use_cache,
+        lambda output: check_agent_output(parse_agent_output(output), weight),
+    )
+
+
+async def run_combined_agent(categories, repo_content, use_cache=True):
+    """
+    Score every category with a single LLM call (see create_combined_agent).
+    Cached like run_agent, keyed on the combined rubric text.
+    """
+    rubric_sections = build_rubric_sections(categories)
+    return await _run_cached(
+        COMBINED_LABEL, rubric_sections, COMBINED_PROMPT_TEMPLATE,
+        lambda: create_combined_agent(categories),
+        repo_content, use_cache,
+        lambda output: check_combined_output(parse_agent_output(output), categories),
+    )
@@ -0,0 +1,21 @@
+import asyncio
+from agents.base_agent import run_combined_agent
+from agents import innovation_agent, technical_agent, feasibility_agent, impact_agent, presentation_agent
+from utils.github_utils import fetch_repo_snapshot_async
+from utils.content_packer import pack_snapshot
+
+# Same keys as the per-agent report in app.py
+CATEGORIES = {
+    innovation_agent.CATEGORY_KEY: (innovation_agent.CATEGORY_NAME, innovation_agent.WEIGHT, innovation_agent.RUBRIC),
+    technical_agent.CATEGORY_KEY: (technical_agent.CATEGORY_NAME, technical_agent.WEIGHT, technical_agent.RUBRIC),
+    feasibility_agent.CATEGORY_KEY: (feasibility_agent.CATEGORY_NAME, feasibility_agent.WEIGHT, feasibility_agent.RUBRIC),
+    impact_agent.CATEGORY_KEY: (impact_agent.CATEGORY_NAME, impact_agent.WEIGHT, impact_agent.RUBRIC),
+    presentation_agent.CATEGORY_KEY: (presentation_agent.CATEGORY_NAME, presentation_agent.WEIGHT, presentation_agent.RUBRIC),
+}
+
+async def evaluate_combined(repo_url, snapshot=None, use_cache=True):
+    if snapshot is None:
+        snapshot = await fetch_repo_snapshot_async(repo_url)
+    packed = await asyncio.to_thread(pack_snapshot, snapshot)
+    output = await run_combined_agent(CATEGORIES, packed.text, use_cache=use_cache)
+    return output
@@ -1,10 +1,12 @@
-from agents.base_agent import create_agent
-from utils.github_utils import fetch_github_content
-from utils.github_utils import estimate_gemini_tokens
+import asyncio
+from agents.base_agent import run_agent
+from utils.github_utils import fetch_repo_snapshot_async
+from utils.content_packer import pack_snapshot
 
-def evaluate_feasibility(repo_url):
-    repo_content = fetch_github_content(repo_url)
-    rubric = """Assess if the project is functional, complete, and deployable.
+CATEGORY_KEY = "Feasibility"
+CATEGORY_NAME = "Feasibility & Completeness"
+WEIGHT = 20
+RUBRIC = """Assess if the project is functional, complete, and deployable.
                 Content to look for:
 
                 Working prototype: Does the code run without major errors?
@@ -22,7 +24,11 @@ def evaluate_feasibility(repo_url):
                 | 6–10        | Partially feasible; multiple features incomplete or unrealistic.                           |
                 | 0–5         | Not feasible; major features missing or impractical.                                       |
                 """
-    agent = create_agent("Feasibility & Completeness", 20, rubric)
-    estimate_gemini_tokens(repo_content)
-    output = agent.run({"repo_content": repo_content})
+
+async def evaluate_feasibility(repo_url, snapshot=None, use_cache=True):
+    if snapshot is None:
+        snapshot = await fetch_repo_snapshot_async(repo_url)
+    # Most relevant files for this category, within the prompt token budget
+    packed = await asyncio.to_thread(pack_snapshot, snapshot, CATEGORY_KEY)
+    output = await run_agent(CATEGORY_NAME, WEIGHT, RUBRIC, packed.text, use_cache=use_cache)
     return output
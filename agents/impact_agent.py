@@ -1,10 +1,12 @@
-from agents.base_agent import create_agent
-from utils.github_utils import fetch_github_content
-from utils.github_utils import estimate_gemini_tokens
+import asyncio
+from agents.base_agent import run_agent
+from utils.github_utils import fetch_repo_snapshot_async
+from utils.content_packer import pack_snapshot
 
-def evaluate_impact(repo_url):
-    repo_content = fetch_github_content(repo_url)
-    rubric = """Evaluate societal or business impact, target audience, and scalability.
+CATEGORY_KEY = "Impact"
+CATEGORY_NAME = "Impact & Scalability"
+WEIGHT = 15
+RUBRIC = """Evaluate societal or business impact, target audience, and scalability.
                 Content to look for:
 
                 Practical applicability: Who benefits from this solution?
@@ -22,7 +24,11 @@ def evaluate_impact(repo_url):
                 | 5–8         | Limited impact or scalability.                                                          |
                 | 0–4         | No clear impact or scalability.                                                         |
                 """
-    agent = create_agent("Impact & Scalability", 15, rubric)
-    estimate_gemini_tokens(repo_content)
-    output = agent.run({"repo_content": repo_content})
+
+async def evaluate_impact(repo_url, snapshot=None, use_cache=True):
+    if snapshot is None:
+        snapshot = await fetch_repo_snapshot_async(repo_url)
+    # Most relevant files for this category, within the prompt token budget
+    packed = await asyncio.to_thread(pack_snapshot, snapshot, CATEGORY_KEY)
+    output = await run_agent(CATEGORY_NAME, WEIGHT, RUBRIC, packed.text, use_cache=use_cache)
     return output
@@ -1,10 +1,12 @@
-from agents.base_agent import create_agent
-from utils.github_utils import fetch_github_content
-from utils.github_utils import estimate_gemini_tokens
+import asyncio
+from agents.base_agent import run_agent
+from utils.github_utils import fetch_repo_snapshot_async
+from utils.content_packer import pack_snapshot
 
-def evaluate_innovation(repo_url):
-    repo_content = fetch_github_content(repo_url)
-    rubric = """How novel, creative, and well-understood the problem statement is.
+CATEGORY_KEY = "Innovation"
+CATEGORY_NAME = "Innovation & Problem Understanding"
+WEIGHT = 25
+RUBRIC = """How novel, creative, and well-understood the problem statement is.
                 Content to look for:
                 README clarity: Does it describe the problem clearly?
                 
@@ -24,7 +26,11 @@ def evaluate_innovation(repo_url):
                 | 0–5         | No clear understanding or innovation present.                                                                                  |
 
                 """
-    agent = create_agent("Innovation & Problem Understanding", 25, rubric)
-    estimate_gemini_tokens(repo_content)
-    output = agent.run({"repo_content": repo_content})
+
+async def evaluate_innovation(repo_url, snapshot=None, use_cache=True):
+    if snapshot is None:
+        snapshot = await fetch_repo_snapshot_async(repo_url)
+    # Most relevant files for this category, within the prompt token budget
+    packed = await asyncio.to_thread(pack_snapshot, snapshot, CATEGORY_KEY)
+    output = await run_agent(CATEGORY_NAME, WEIGHT, RUBRIC, packed.text, use_cache=use_cache)
     return output
@@ -1,10 +1,12 @@
-from agents.base_agent import create_agent
-from utils.github_utils import fetch_github_content
-from utils.github_utils import estimate_gemini_tokens
+import asyncio
+from agents.base_agent import run_agent
+from utils.github_utils import fetch_repo_snapshot_async
+from utils.content_packer import pack_snapshot
 
-def evaluate_presentation(repo_url):
-    repo_content = fetch_github_content(repo_url)
-    rubric = """Evaluate clarity of README, visuals, and ease of understanding for end-users.
+CATEGORY_KEY = "Presentation"
+CATEGORY_NAME = "Presentation & Communication"
+WEIGHT = 15
+RUBRIC = """Evaluate clarity of README, visuals, and ease of understanding for end-users.
                 Content to look for:
 
                 README structure: Clear sections (Overview, Installation, Usage, Results).
@@ -22,7 +24,11 @@ def evaluate_presentation(repo_url):
                 | 5–8         | Somewhat unclear; difficult to follow in places.                                             |
                 | 0–4         | Poorly communicated; confusing or incomplete.                                                |
                 """
-    agent = create_agent("Presentation & Communication", 15, rubric)
-    estimate_gemini_tokens(repo_content)
-    output = agent.run({"repo_content": repo_content})
+
+async def evaluate_presentation(repo_url, snapshot=None, use_cache=True):
+    if snapshot is None:
+        snapshot = await fetch_repo_snapshot_async(repo_url)
+    # Most relevant files for this category, within the prompt token budget
+    packed = await asyncio.to_thread(pack_snapshot, snapshot, CATEGORY_KEY)
+    output = await run_agent(CATEGORY_NAME, WEIGHT, RUBRIC, packed.text, use_cache=use_cache)
     return output
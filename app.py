@@ -1,6 +1,10 @@
 # app.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, HttpUrl
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+import asyncio
 import json
 import time
 
@@ -10,52 +14,419 @@ from agents.technical_agent import evaluate_technical
 from agents.feasibility_agent import evaluate_feasibility
 from agents.impact_agent import evaluate_impact
 from agents.presentation_agent import evaluate_presentation
+from agents.combined_agent import CATEGORIES, evaluate_combined
+from agents.base_agent import (
+    COMBINED_LABEL, COMBINED_PROMPT_TEMPLATE, MODEL_NAME, PROMPT_TEMPLATE, RUBRIC_VERSION,
+    build_agents, check_agent_output, parse_agent_output,
+)
+from utils import metrics
+from utils.content_packer import pack_snapshot
+from utils.incremental import diff_trees, input_fingerprint, summarize_diff
+from utils.ingest import summarize_skipped
+from utils.github_utils import fetch_repo_snapshot_async
+from utils.job_store import JobStore, BatchWorkerPool
+from utils.rate_limiter import GitHubRateLimitError
+from utils.results_store import get_results_store
+
+
+async def warm_up_agents():
+    """
+    Build the agent chains (and the shared Gemini client) in the background after startup.
+    Returns True if they were built, False if the build failed (e.g. no GOOGLE_API_KEY).
+    """
+    try:
+        count = await asyncio.to_thread(build_agents, CATEGORIES)
+        print(f"🧰 Built {count} agents")
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not prebuild agents ({e}); they will be built on first use")
+        return False
+
+@asynccontextmanager
+async def lifespan(app):
+    # Batch jobs are persisted in SQLite and drained by a bounded worker pool
+    from utils.config import load_env
+    import os
+    load_env()
+    app.state.results_store = get_results_store()
+    # One-shot migration of the leaderboard CSV the dashboard used to write
+    imported = app.state.results_store.import_csv(os.getenv("RESULTS_IMPORT_CSV", "evaluation_results.csv"))
+    if imported:
+        print(f"📥 Imported {imported} rows from the old leaderboard CSV")
+
+    app.state.job_store = JobStore(os.getenv("JOB_STORE_PATH", os.path.join("data", "jobs.sqlite3")))
+    app.state.workers = BatchWorkerPool(
+        app.state.job_store, evaluate_and_save, workers=int(os.getenv("BATCH_WORKERS", "4"))
+    )
+    app.state.workers.start()
+    # Serve requests (and /health) right away while the chains are built
+    app.state.agents_warm_up = asyncio.create_task(warm_up_agents())
+    yield
+    await app.state.workers.stop()
+
 # top of your script (before any ChatGoogleGenerativeAI() calls)
-app = FastAPI(title="Hackathon Repo Evaluation API")
+app = FastAPI(title="Hackathon Repo Evaluation API", lifespan=lifespan)
+
+@app.get("/health")
+async def health():
+    """Liveness check; cheap enough for load balancers to poll."""
+    warm_up = app.state.agents_warm_up
+    return {"status": "ok", "agents_ready": warm_up.done() and warm_up.result()}
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: GitHub requests, packing, LLM calls and evaluation times."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # Input model
 class RepoRequest(BaseModel):
     repo_url: str
+    team_name: str = ""
+    no_cache: bool = False  # bypass cached LLM results and re-run every agent
+    # "per_agent": one LLM call per category; "combined": all rubrics in one call.
+    # Defaults to the EVAL_MODE environment variable.
+    mode: Optional[Literal["per_agent", "combined"]] = None
+    include_timings: bool = False  # add a per-stage "timings" breakdown to the report
 
-# Multi-agent orchestrator
-def orchestrate_evaluation(repo_url: str):
-    print(f">Starting multi-agent evaluation for: {repo_url}\n")
-    results = {}
-    total_score = 0
-
-    agents = {
-        "Innovation": evaluate_innovation,
-        "Technical": evaluate_technical,
-        "Feasibility": evaluate_feasibility,
-        "Impact": evaluate_impact,
-        "Presentation": evaluate_presentation,
-    }
+class BatchItem(BaseModel):
+    repo_url: str
+    team_name: str = ""
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    no_cache: bool = False
+    mode: Optional[Literal["per_agent", "combined"]] = None
 
-    for name, func in agents.items():
+EVAL_MODES = ("per_agent", "combined")
+
+AGENTS = {
+    "Innovation": evaluate_innovation,
+    "Technical": evaluate_technical,
+    "Feasibility": evaluate_feasibility,
+    "Impact": evaluate_impact,
+    "Presentation": evaluate_presentation,
+}
+
+async def run_per_agent(repo_url, snapshot, use_cache, names=None):
+    """
+    One LLM call per category (all of AGENTS, or just `names`), all running at once.
+    Yields (name, result, ok) as each finishes; ok is False for the score-0 fallback.
+    """
+    async def run_one(name, func):
         print(f"🤖 Evaluating {name}...")
         try:
-            res = func(repo_url)
-            clean_str = res.strip().lstrip("```json").rstrip("```").strip()
-            data = json.loads(clean_str)
-            time.sleep(5)  # optional: adjust delay to prevent rate limiting
+            res = await func(repo_url, snapshot=snapshot, use_cache=use_cache)
+            try:
+                data = parse_agent_output(res)
+            except ValueError:
+                metrics.LLM_PARSE_FAILURES.inc(agent=CATEGORIES[name][0])
+                raise
+            return name, check_agent_output(data, CATEGORIES[name][1]), True
         except Exception as e:
-            data = {"category": name, "score": 0, "feedback": str(e)}
+            return name, {"category": name, "score": 0, "feedback": str(e)}, False
+
+    # All agents run at once on the event loop; Gemini request rate is governed by the shared rate limiter
+    tasks = [asyncio.create_task(run_one(name, AGENTS[name])) for name in (names or AGENTS)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away or the caller stopped early: don't keep paying for LLM calls
+        for task in tasks:
+            task.cancel()
+
+async def run_combined(repo_url, snapshot, use_cache, names=None):
+    """Every rubric in a single LLM call, split back into the per-category structure."""
+    print("🤖 Evaluating all categories in one call...")
+    try:
+        res = await evaluate_combined(repo_url, snapshot=snapshot, use_cache=use_cache)
+        try:
+            combined = parse_agent_output(res)
+        except ValueError:
+            metrics.LLM_PARSE_FAILURES.inc(agent=COMBINED_LABEL)
+            raise
+        error = None
+    except Exception as e:
+        combined, error = None, str(e)
+
+    for name in (names or AGENTS):
+        try:
+            if error:
+                raise ValueError(error)
+            if not isinstance(combined, dict):
+                raise ValueError(f"Expected a JSON object, got {type(combined).__name__}")
+            if name not in combined:
+                raise ValueError("Category missing from combined response")
+            result, ok = check_agent_output(combined[name], CATEGORIES[name][1]), True
+        except ValueError as e:
+            result, ok = {"category": name, "score": 0, "feedback": str(e)}, False
+        yield name, result, ok
+
+def input_fingerprints(snapshot, mode):
+    """
+    Fingerprint of what each category's agent would be asked (see utils.incremental).
+    In combined mode one prompt serves every category, so they share one fingerprint.
+    Packs the snapshot as a side effect; the agents reuse those packs.
+    """
+    config = [MODEL_NAME, RUBRIC_VERSION, mode]
+    if mode == "combined":
+        fingerprint = input_fingerprint(
+            pack_snapshot(snapshot), config + [COMBINED_PROMPT_TEMPLATE, list(CATEGORIES.values())]
+        )
+        return {name: fingerprint for name in AGENTS}
+    return {
+        name: input_fingerprint(pack_snapshot(snapshot, name), config + [PROMPT_TEMPLATE, list(CATEGORIES[name])])
+        for name in AGENTS
+    }
+
+_evaluation_slots = None
 
-        results[name] = data
-        total_score += data.get("score", 0)
+def get_evaluation_slots():
+    """Caps how many evaluations run at once (MAX_CONCURRENT_EVALUATIONS, default 16)."""
+    global _evaluation_slots
+    if _evaluation_slots is None:
+        import os
+        _evaluation_slots = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENT_EVALUATIONS", "16")))
+    return _evaluation_slots
 
-    report = {"repository": repo_url, "total_score": total_score, "details": results}
+# Multi-agent orchestrator
+async def iter_evaluation(repo_url: str, use_cache: bool = True, mode: str = None, include_timings: bool = False):
+    """
+    Run an evaluation step by step, yielding progress events:
+        {"event": "fetching", "repository": ...}
+        {"event": "fetched", "commit_sha": ..., "files": ..., "error": ..., "changes": ...}
+        {"event": "category", "name": ..., "result": {...}, "carried_over": ...}   (one per category, as soon as it is ready)
+        {"event": "done", "report": {...}}
+
+    Re-evaluations are incremental: the tree of the last evaluation of the repo
+    is diffed against the new one by blob SHA, and a category whose inputs did
+    not change (see utils.incremental) keeps its previous score instead of
+    calling the LLM again. use_cache=False re-runs every category.
+
+    With include_timings the report also gets a "timings" breakdown: fetch time
+    and GitHub requests/bytes, packing time per category, and per agent the LLM
+    latency, tokens, retries and whether the answer came from the cache.
+    """
+    from utils.config import load_env
+    import os
+    load_env()
+    mode = mode or os.getenv("EVAL_MODE", "per_agent")
+    if mode not in EVAL_MODES:
+        raise ValueError(f"Unknown evaluation mode: {mode}")
+
+    async with get_evaluation_slots():
+        timings = metrics.start_breakdown()
+        started = time.perf_counter()
+        print(f">Starting multi-agent evaluation for: {repo_url}\n")
+        yield {"event": "fetching", "repository": repo_url}
+
+        # Fetch the repository once and share it with every agent
+        snapshot = await fetch_repo_snapshot_async(repo_url)
+        print(f"📦 Fetched {len(snapshot.files)} files at commit {snapshot.commit_sha or 'unknown'}")
+        if snapshot.skipped:
+            print(f"🗑️ Skipped {len(snapshot.skipped)} generated or oversized files")
+
+        # What did the last evaluation of this repo see?
+        store = getattr(app.state, "results_store", None)
+        track = store is not None and not snapshot.error
+        previous = await asyncio.to_thread(store.get_repo_state, repo_url, mode) if track and use_cache else None
+        changes = summarize_diff(diff_trees(previous["tree"], snapshot.blob_shas)) if previous else None
+        yield {
+            "event": "fetched",
+            "commit_sha": snapshot.commit_sha,
+            "files": len(snapshot.files),
+            "skipped": len(snapshot.skipped),
+            "error": snapshot.error,
+            "changes": changes,
+        }
+
+        fingerprints = await asyncio.to_thread(input_fingerprints, snapshot, mode) if track else {}
+        finished, succeeded = {}, set()
+        for name in AGENTS:
+            old = previous["categories"].get(name) if previous else None
+            if old and old["fingerprint"] == fingerprints[name]:
+                try:
+                    result = check_agent_output(old["result"], CATEGORIES[name][1])
+                except ValueError:
+                    continue  # a malformed answer from an older run; ask again
+                finished[name] = result
+                succeeded.add(name)
+                yield {"event": "category", "name": name, "result": result, "carried_over": True}
+        if finished:
+            print(f"♻️ Carried over unchanged categories: {', '.join(finished)}")
+
+        recompute = [name for name in AGENTS if name not in finished]
+        if recompute:
+            run = run_combined if mode == "combined" else run_per_agent
+            async for name, data, ok in run(repo_url, snapshot, use_cache, recompute):
+                finished[name] = data
+                if ok:
+                    succeeded.add(name)
+                yield {"event": "category", "name": name, "result": data, "carried_over": False}
+
+        # An empty tree without an error (e.g. the tree request 404'd) must not
+        # replace the state of the last real fetch
+        if track and snapshot.blob_shas:
+            # Only successful scores are worth carrying over next time
+            await asyncio.to_thread(
+                store.save_repo_state, repo_url, mode, snapshot.commit_sha, snapshot.blob_shas,
+                {name: {"fingerprint": fingerprints[name], "result": finished[name]} for name in succeeded},
+            )
+
+        elapsed = time.perf_counter() - started
+        metrics.EVALUATION_SECONDS.observe(elapsed, mode=mode)
+        timings["total_s"] = round(elapsed, 4)
+
+    # Report categories in the usual order, whatever order they finished in
+    results = {name: finished[name] for name in AGENTS}
+    total_score = sum(data.get("score", 0) for data in results.values())
+
+    report = {
+        "repository": repo_url,
+        "commit_sha": snapshot.commit_sha,
+        "mode": mode,
+        "total_score": total_score,
+        "details": results,
+        # What each prompt contained after packing to the token budget
+        "packing": {
+            (category or "combined"): packed.summary() for category, packed in snapshot.packed.items()
+        },
+        # Files left out before packing: generated/lock files and ones over the size limits
+        "skipped_files": summarize_skipped(snapshot.skipped),
+        # Which scores were reused from the last evaluation of this repo
+        "incremental": {
+            "previous_commit": previous["commit_sha"] if previous else None,
+            "changes": changes,
+            "carried_over": [name for name in AGENTS if name not in recompute],
+            "recomputed": recompute,
+        },
+    }
+    if include_timings:
+        report["timings"] = timings
     print("\n✅ Evaluation complete!\n")
+    yield {"event": "done", "report": report}
+
+async def orchestrate_evaluation(repo_url: str, use_cache: bool = True, mode: str = None, include_timings: bool = False):
+    async for event in iter_evaluation(repo_url, use_cache=use_cache, mode=mode, include_timings=include_timings):
+        if event["event"] == "done":
+            return event["report"]
+
+async def save_report(report, team_name=""):
+    """Record a finished evaluation on the leaderboard."""
+    report["evaluation_id"] = await asyncio.to_thread(app.state.results_store.save_report, report, team_name)
     return report
 
+async def evaluate_and_save(repo_url: str, use_cache: bool = True, mode: str = None, team_name: str = "",
+                            include_timings: bool = False):
+    report = await orchestrate_evaluation(repo_url, use_cache=use_cache, mode=mode, include_timings=include_timings)
+    return await save_report(report, team_name)
+
 # API endpoint
 @app.post("/evaluate")
-def evaluate_repo(request: RepoRequest):
+async def evaluate_repo(request: RepoRequest, http_request: Request):
+    evaluation = asyncio.create_task(evaluate_and_save(
+        request.repo_url, use_cache=not request.no_cache, mode=request.mode, team_name=request.team_name,
+        include_timings=request.include_timings,
+    ))
     try:
-        report = orchestrate_evaluation(request.repo_url)
-        return report
+        # Stop the agents (and the LLM spend) if the client hangs up before the report is ready
+        while not evaluation.done():
+            await asyncio.wait({evaluation}, timeout=1.0)
+            if not evaluation.done() and await http_request.is_disconnected():
+                evaluation.cancel()
+                print(f"🛑 Client disconnected, cancelled evaluation of {request.repo_url}")
+                raise HTTPException(status_code=499, detail="Client closed request")
+        return evaluation.result()
+    except HTTPException:
+        raise
+    except GitHubRateLimitError as e:
+        # Nothing was scored; the client can resubmit once GitHub's quota resets
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        evaluation.cancel()
+
+@app.post("/evaluate/stream")
+async def evaluate_repo_stream(request: RepoRequest):
+    """
+    Same evaluation as /evaluate, streamed as NDJSON: one JSON event per line
+    (see iter_evaluation), so results show up as soon as each agent finishes.
+    A client that disconnects cancels the evaluation.
+    """
+    async def ndjson():
+        try:
+            async for event in iter_evaluation(
+                request.repo_url, use_cache=not request.no_cache, mode=request.mode,
+                include_timings=request.include_timings,
+            ):
+                if event["event"] == "done":
+                    await save_report(event["report"], request.team_name)
+                yield json.dumps(event) + "\n"
+        except GitHubRateLimitError as e:
+            yield json.dumps({"event": "error", "detail": str(e), "retry_after": int(e.retry_after) + 1}) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+# Batch endpoints: queue many repos at once and poll for results
+@app.post("/evaluations/batch", status_code=202)
+async def create_batch(request: BatchRequest):
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No repositories to evaluate")
+    batch_id, jobs = await asyncio.to_thread(
+        app.state.job_store.create_batch,
+        [item.model_dump() for item in request.items],
+        mode=request.mode,
+        use_cache=not request.no_cache,
+    )
+    app.state.workers.notify()
+    return {"batch_id": batch_id, "jobs": jobs}
+
+@app.get("/evaluations/batches/{batch_id}")
+def get_batch(batch_id: str):
+    jobs = app.state.job_store.list_batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    counts = {}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    return {"batch_id": batch_id, "counts": counts, "jobs": jobs}
+
+@app.get("/evaluations/{job_id}")
+def get_job(job_id: str):
+    job = app.state.job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/evaluations/{job_id}/result")
+def get_job_result(job_id: str):
+    job = app.state.job_store.get(job_id, with_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
+# Leaderboard, served from the results store
+@app.get("/leaderboard")
+def get_leaderboard(
+    view: Literal["all", "latest_per_repo", "latest_per_team"] = "all",
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    return app.state.results_store.leaderboard(view=view, limit=limit, offset=offset)
+
+@app.get("/results/{evaluation_id}")
+def get_result(evaluation_id: int):
+    result = app.state.results_store.get(evaluation_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    return result
 
 # For direct testing
 if __name__ == "__main__":
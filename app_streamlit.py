@@ -8,14 +8,13 @@ st.set_page_config(page_title="Hackathon Evaluator", layout="wide")
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Go to", ["Evaluation", "Leaderboard"])
 
-CSV_FILE = "evaluation_results.csv"
+API_URL = os.getenv("EVALUATOR_API_URL", "http://localhost:8000")
 
 # --- Evaluation Page ---
 if page == "Evaluation":
+    import json
     import requests
-    import pandas as pd
     import plotly.graph_objects as go
-    from datetime import datetime
 
     # Header with logo
     col1, col2 = st.columns([1, 5])
@@ -37,102 +36,147 @@ if page == "Evaluation":
     repo_url = st.text_input("Enter GitHub repository URL:")
     team_name = st.text_input("Enter Team Name (optional)")
 
+    def render_category(cat, val, carried_over=False):
+        st.subheader(f"{cat} (Score: {val['score']}/{category_max[cat]})")
+        if carried_over:
+            st.caption("♻️ Relevant files unchanged since the last evaluation; score carried over")
+        st.write(val["feedback"])
+
+        fig = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=val["score"],
+            number={'suffix': f"/{category_max[cat]}"},
+            title={'text': cat, 'font': {'size': 18}},
+            gauge={
+                'axis': {'range': [0, category_max[cat]]},
+                'bar': {'color': "#003366"},
+                'steps': [
+                    {'range': [0, category_max[cat]*0.5], 'color': "#f4cccc"},
+                    {'range': [category_max[cat]*0.5, category_max[cat]*0.8], 'color': "#ffe599"},
+                    {'range': [category_max[cat]*0.8, category_max[cat]], 'color': "#d9ead3"}
+                ],
+            }
+        ))
+        st.plotly_chart(fig, use_container_width=True)
+
     if st.button("Evaluate"):
         if not repo_url.strip():
             st.warning("⚠️ Please enter a valid GitHub repository URL.")
             st.stop()
 
-        with st.spinner("Running evaluation..."):
-            try:
-                response = requests.post(
-                    "http://localhost:8000/evaluate",
-                    json={"repo_url": repo_url},
-                    timeout=300
-                )
-                report = response.json()
-            except Exception as e:
-                st.error(f"❌ Error calling evaluation API: {e}")
-                st.stop()
+        # Results stream in as NDJSON events; each gauge is drawn as soon as its agent finishes
+        status = st.status("Running evaluation...", expanded=False)
+        total_placeholder = st.empty()
+        st.markdown("---")
+        slots = {cat: st.empty() for cat in category_max}
+        report = None
+        try:
+            with requests.post(
+                f"{API_URL}/evaluate/stream",
+                json={"repo_url": repo_url, "team_name": team_name.strip()},
+                stream=True,
+                timeout=(10, 300),  # read timeout applies between events, not to the whole run
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["event"] == "fetching":
+                        status.update(label="Fetching repository...")
+                    elif event["event"] == "fetched":
+                        changes = event.get("changes")
+                        if changes:
+                            status.update(
+                                label=f"Fetched {event['files']} files ({changes['added']} added, "
+                                f"{changes['changed']} changed, {changes['removed']} removed since last time), evaluating..."
+                            )
+                        else:
+                            status.update(label=f"Fetched {event['files']} files, evaluating...")
+                    elif event["event"] == "category":
+                        with slots[event["name"]].container():
+                            render_category(event["name"], event["result"], event.get("carried_over", False))
+                    elif event["event"] == "done":
+                        report = event["report"]
+                    elif event["event"] == "error":
+                        raise RuntimeError(event["detail"])
+        except Exception as e:
+            status.update(label="Evaluation failed", state="error")
+            st.error(f"❌ Error calling evaluation API: {e}")
+            st.stop()
 
-        total_score = report.get("total_score", 0)
-        st.success(f"✅ Total Score: {total_score}/100")
+        if report is None:
+            status.update(label="Evaluation incomplete", state="error")
+            st.error("❌ The evaluation API closed the stream before finishing.")
+            st.stop()
 
-        # Show gauges and feedback
-        st.markdown("---")
-        for cat, val in report["details"].items():
-            st.subheader(f"{cat} (Score: {val['score']}/{category_max[cat]})")
-            st.write(val["feedback"])
-
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=val["score"],
-                number={'suffix': f"/{category_max[cat]}"},
-                title={'text': cat, 'font': {'size': 18}},
-                gauge={
-                    'axis': {'range': [0, category_max[cat]]},
-                    'bar': {'color': "#003366"},
-                    'steps': [
-                        {'range': [0, category_max[cat]*0.5], 'color': "#f4cccc"},
-                        {'range': [category_max[cat]*0.5, category_max[cat]*0.8], 'color': "#ffe599"},
-                        {'range': [category_max[cat]*0.8, category_max[cat]], 'color': "#d9ead3"}
-                    ],
-                }
-            ))
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Save results to CSV
-        data = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "github_url": repo_url,
-            "team_name": team_name if team_name.strip() else "",
-            "total_score": total_score,
-        }
-        for cat, val in report["details"].items():
-            data[cat] = val["score"]
-
-        df_new = pd.DataFrame([data])
-        if os.path.exists(CSV_FILE):
-            df_existing = pd.read_csv(CSV_FILE)
-            df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-            df_combined.to_csv(CSV_FILE, index=False)
-        else:
-            df_new.to_csv(CSV_FILE, index=False)
+        status.update(label="Evaluation complete", state="complete")
+        total_score = report.get("total_score", 0)
+        total_placeholder.success(f"✅ Total Score: {total_score}/100")
 
+        # The API records every evaluation in its results store
         st.success("📊 Results saved to leaderboard data!")
 
 # --- Leaderboard Page ---
 elif page == "Leaderboard":
+    import requests
     import pandas as pd
 
     st.title("🏆 Hackathon Leaderboard")
 
+    views = {
+        "Latest evaluation per repository": "latest_per_repo",
+        "Latest evaluation per team": "latest_per_team",
+        "All evaluations": "all",
+    }
+
+    @st.cache_data(ttl=30, show_spinner=False)
+    def fetch_leaderboard(view, limit, offset):
+        response = requests.get(
+            f"{API_URL}/leaderboard",
+            params={"view": view, "limit": limit, "offset": offset},
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        view = views[st.selectbox("Show", list(views))]
+    with col2:
+        page_size = st.selectbox("Rows per page", [25, 50, 100], index=1)
+
     try:
-        df = pd.read_csv(CSV_FILE)
-        if df.empty:
-            st.info("No evaluation data yet. Please evaluate some repositories first.")
-        else:
-            # Sort by total score
-            df = df.sort_values(by="total_score", ascending=False).reset_index(drop=True)
-
-            st.subheader("📋 Evaluation Results")
-            st.dataframe(
-                df.style.background_gradient(cmap="Blues").format(precision=1),
-                use_container_width=True
-            )
-
-            # Bar chart of total scores
-            st.subheader("📊 Total Scores Comparison")
-            st.bar_chart(df.set_index("team_name")["total_score"])
-
-            # Highlight top project
-            top_repo = df.iloc[0]
-            st.markdown(
-                f"### 🥇 Top Project: **{top_repo['team_name']}** — {top_repo['total_score']}/100"
-            )
-
-            # Download CSV button
-            csv = df.to_csv(index=False)
-            st.download_button("📥 Download Leaderboard CSV", csv, "evaluation_results.csv", "text/csv")
-
-    except FileNotFoundError:
-        st.warning("⚠️ No leaderboard data file found. Please run evaluations first.")
+        first_page = fetch_leaderboard(view, page_size, 0)
+    except Exception as e:
+        st.error(f"❌ Error calling leaderboard API: {e}")
+        st.stop()
+
+    if first_page["total"] == 0:
+        st.info("No evaluation data yet. Please evaluate some repositories first.")
+        st.stop()
+
+    pages = (first_page["total"] - 1) // page_size + 1
+    page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+    board = first_page if page_number == 1 else fetch_leaderboard(view, page_size, (page_number - 1) * page_size)
+    df = pd.DataFrame(board["rows"]).drop(columns=["id"])
+
+    st.subheader(f"📋 Evaluation Results ({board['total']} total)")
+    st.dataframe(
+        df.style.background_gradient(cmap="Blues").format(precision=1),
+        use_container_width=True
+    )
+
+    # Bar chart of total scores
+    st.subheader("📊 Total Scores Comparison")
+    st.bar_chart(df.set_index("team_name")["total_score"])
+
+    # Highlight top project (rows come sorted by total score)
+    top_repo = first_page["rows"][0]
+    st.markdown(
+        f"### 🥇 Top Project: **{top_repo['team_name'] or top_repo['github_url']}** — {top_repo['total_score']}/100"
+    )
+
+    # Download CSV button
+    csv = df.to_csv(index=False)
+    st.download_button("📥 Download Leaderboard CSV", csv, "evaluation_results.csv", "text/csv")
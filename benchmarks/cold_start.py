@@ -0,0 +1,93 @@
+"""
+Cold-start check for the API.
+
+Measures, each in a fresh interpreter:
+  - how long `import app` takes
+  - how long it takes from launching uvicorn until /health answers
+
+and fails (exit code 1) when the median is over the target.
+
+    python benchmarks/cold_start.py [--runs 5] [--import-target 0.8] [--health-target 2.5]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds. Importing langchain at module level used to put `import app` at ~1.8s.
+IMPORT_TARGET = 0.8
+HEALTH_TARGET = 2.5
+
+
+def measure_import():
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_health(timeout=30.0):
+    port = _free_port()
+    data_dir = tempfile.mkdtemp(prefix="cold_start_")
+    env = dict(
+        os.environ,
+        JOB_STORE_PATH=os.path.join(data_dir, "jobs.sqlite3"),
+        RESULTS_DB_PATH=os.path.join(data_dir, "results.sqlite3"),
+    )
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"/health did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-target", type=float, default=IMPORT_TARGET)
+    parser.add_argument("--health-target", type=float, default=HEALTH_TARGET)
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    healths = [measure_health() for _ in range(args.runs)]
+    result = {
+        "import_app_s": round(statistics.median(imports), 3),
+        "first_health_s": round(statistics.median(healths), 3),
+        "import_target_s": args.import_target,
+        "health_target_s": args.health_target,
+        "runs": args.runs,
+    }
+    print(json.dumps(result, indent=2))
+
+    ok = result["import_app_s"] <= args.import_target and result["first_health_s"] <= args.health_target
+    print("✅ Within target" if ok else "❌ Cold start is over target")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
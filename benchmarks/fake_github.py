@@ -0,0 +1,180 @@
+"""
+Local stand-in for the GitHub endpoints the `api` and `graphql` fetch backends
+use (/commits, /git/trees, /contents, /readme, /graphql), serving synthetic
+repositories.
+
+The repository name sets its shape: `files-<count>-size-<bytes>`, e.g.
+
+    GET /repos/bench/files-200-size-4096/git/trees/<sha>?recursive=1
+
+lists 200 files of ~4 KB (plus a README). Contents are generated
+deterministically, so every run sees identical repositories. Every request
+waits FAKE_GITHUB_LATENCY_MS (default 0) before answering.
+
+Like GitHub, responses carry X-RateLimit-* headers and an ETag, and a request
+with a matching If-None-Match gets a 304 that does not count against the
+quota. FAKE_GITHUB_RATE_LIMIT (default 1000000) requests are allowed per
+resource ("core", "graphql") and FAKE_GITHUB_RATE_WINDOW_S (default 3600)
+seconds; over it, requests get a 403.
+
+    FAKE_GITHUB_LATENCY_MS=50 uvicorn benchmarks.fake_github:app --port 9100
+    GITHUB_API_URL=http://127.0.0.1:9100 ...
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from functools import lru_cache
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+app = FastAPI(title="Fake GitHub API")
+
+LATENCY = float(os.getenv("FAKE_GITHUB_LATENCY_MS", "0")) / 1000
+RATE_LIMIT = int(os.getenv("FAKE_GITHUB_RATE_LIMIT", "1000000"))
+RATE_WINDOW = float(os.getenv("FAKE_GITHUB_RATE_WINDOW_S", "3600"))
+
+# resource -> [window reset (epoch seconds), requests used]
+_quota = {}
+
+# Spread files over a few directories and the extensions the fetcher keeps
+_EXTENSIONS = (".py", ".py", ".py", ".md", ".txt", ".yaml", ".json")
+_DIRS = ("", "src/", "src/core/", "tests/", "docs/")
+
+
+def _shape(repo):
+    match = re.fullmatch(r"files-(\d+)-size-(\d+)", repo)
+    if not match:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return int(match.group(1)), int(match.group(2))
+
+
+def _sha(*parts):
+    return hashlib.sha1("/".join(str(p) for p in parts).encode()).hexdigest()
+
+
+@lru_cache(maxsize=16)
+def _paths(count):
+    return tuple(f"{_DIRS[i % len(_DIRS)]}module_{i}{_EXTENSIONS[i % len(_EXTENSIONS)]}" for i in range(count))
+
+
+@lru_cache(maxsize=16)
+def _path_set(count):
+    return frozenset(_paths(count))
+
+
+def _content(path, size):
+    line = f"# {path}: synthetic benchmark content\nvalue_{len(path)} = {sum(map(ord, path))}\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def _readme(repo):
+    return f"# {repo}\n\nSynthetic repository for offline benchmarks.\n" + "Problem, approach and results.\n" * 40
+
+
+async def _latency():
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+
+@lru_cache(maxsize=16)
+def _blobs_by_sha(repo):
+    """blob SHA -> path, for the GraphQL object(oid:) lookups."""
+    count, size = _shape(repo)
+    blobs = {_sha(repo, path, size): path for path in _paths(count)}
+    blobs[_sha(repo, "README.md")] = "README.md"
+    return blobs
+
+
+def _rate_headers(resource):
+    reset, used = _quota.get(resource, (0, 0))
+    return {
+        "X-RateLimit-Limit": str(RATE_LIMIT),
+        "X-RateLimit-Remaining": str(max(0, RATE_LIMIT - used)),
+        "X-RateLimit-Reset": str(int(reset)),
+        "X-RateLimit-Resource": resource,
+    }
+
+
+def _use_quota(resource):
+    """Count one request; raise a 403 like GitHub's once the quota is used up."""
+    now = time.time()
+    reset, used = _quota.get(resource, (0, 0))
+    if now >= reset:
+        reset, used = now + RATE_WINDOW, 0
+    if used >= RATE_LIMIT:
+        raise HTTPException(status_code=403, detail="API rate limit exceeded", headers=_rate_headers(resource))
+    _quota[resource] = (reset, used + 1)
+
+
+def _conditional(request, body, media_type="text/plain"):
+    """Answer 304 (free) if the client already has this body, otherwise count the request and send it."""
+    etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, **_rate_headers("core")})
+    _use_quota("core")
+    return Response(body, media_type=media_type, headers={"ETag": etag, **_rate_headers("core")})
+
+
+@app.get("/repos/{owner}/{repo}/commits/{ref}")
+async def get_commit(owner: str, repo: str, ref: str, request: Request):
+    _shape(repo)
+    await _latency()
+    return _conditional(request, _sha(owner, repo))
+
+
+@app.get("/repos/{owner}/{repo}/git/trees/{ref}")
+async def get_tree(owner: str, repo: str, ref: str, request: Request):
+    count, size = _shape(repo)
+    await _latency()
+    tree = [{"path": "README.md", "type": "blob", "sha": _sha(repo, "README.md"), "size": len(_readme(repo))}]
+    tree += [
+        {"path": path, "type": "blob", "sha": _sha(repo, path, size), "size": size}
+        for path in _paths(count)
+    ]
+    return _conditional(request, json.dumps({"sha": ref, "tree": tree, "truncated": False}), "application/json")
+
+
+@app.get("/repos/{owner}/{repo}/contents/{path:path}")
+async def get_contents(owner: str, repo: str, path: str):
+    count, size = _shape(repo)
+    await _latency()
+    _use_quota("core")
+    if path == "README.md":
+        return PlainTextResponse(_readme(repo), headers=_rate_headers("core"))
+    if path not in _path_set(count):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(_content(path, size), headers=_rate_headers("core"))
+
+
+@app.get("/repos/{owner}/{repo}/readme")
+async def get_readme(owner: str, repo: str, request: Request):
+    _shape(repo)
+    await _latency()
+    return _conditional(request, _readme(repo))
+
+
+@app.post("/graphql")
+async def graphql(request: Request):
+    """
+    Only the query the graphql backend sends: repository(owner:, name:) with
+    aliased `object(oid: "<blob sha>") { ... on Blob { text isTruncated } }` fields.
+    """
+    payload = await request.json()
+    repo = payload.get("variables", {}).get("name", "")
+    await _latency()
+    _use_quota("graphql")
+    count, size = _shape(repo)
+    blobs = _blobs_by_sha(repo)
+    found = {}
+    for alias, sha in re.findall(r'(\w+): object\(oid: "([0-9a-f]+)"\)', payload.get("query", "")):
+        path = blobs.get(sha)
+        if path is None:
+            found[alias] = None
+        else:
+            text = _readme(repo) if path == "README.md" else _content(path, size)
+            found[alias] = {"text": text, "isTruncated": False}
+    return JSONResponse({"data": {"repository": found}}, headers=_rate_headers("graphql"))
@@ -0,0 +1,60 @@
+"""
+Deterministic stand-in for the Gemini chains, for offline benchmarks.
+
+Each fake answers like the real agent after `delay` seconds: valid category
+JSON whose score is derived from a hash of the prompt content, so the same
+repository always gets the same scores.
+"""
+import asyncio
+import hashlib
+import json
+
+from agents.base_agent import COMBINED_LABEL, register_agent
+
+
+class FakeChain:
+    output_key = "text"
+
+    def __init__(self, categories, delay=0.5, combined=False):
+        """
+        Args:
+            categories (dict): key -> (category_name, weight, rubric_desc) this chain scores
+            delay (float): Seconds to wait before answering, like a model call would
+            combined (bool): Answer in the combined-mode format (one entry per category key)
+        """
+        self.categories = categories
+        self.delay = delay
+        self.combined = combined
+        self.calls = 0
+
+    def _score(self, key, weight, repo_content):
+        digest = hashlib.sha256(f"{key}:{repo_content}".encode()).digest()
+        return digest[0] % (weight + 1)
+
+    async def ainvoke(self, inputs, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        answers = {
+            key: {
+                "category": key,
+                "score": self._score(key, weight, inputs["repo_content"]),
+                "feedback": f"Benchmark feedback for {name}",
+            }
+            for key, (name, weight, _) in self.categories.items()
+        }
+        text = json.dumps(answers if self.combined else next(iter(answers.values())))
+        return {self.output_key: text}
+
+
+def install_fake_llm(categories, delay=0.5):
+    """
+    Register fake chains for every category and for combined mode, so
+    evaluations never build a real Gemini client. Returns the fakes by label.
+    """
+    fakes = {}
+    for key, (name, weight, rubric) in categories.items():
+        fakes[name] = FakeChain({key: (name, weight, rubric)}, delay=delay)
+    fakes[COMBINED_LABEL] = FakeChain(categories, delay=delay, combined=True)
+    for label, fake in fakes.items():
+        register_agent(label, fake)
+    return fakes
@@ -0,0 +1,288 @@
+"""
+Offline benchmark suite: evaluation latency, throughput and peak memory
+without touching GitHub or Gemini.
+
+Synthetic repositories are served by benchmarks/fake_github.py (started as a
+subprocess) and every agent is replaced by the deterministic fake in
+benchmarks/fake_llm.py. Caches and rate limits are switched off so each run
+measures the pipeline itself. For every repo size and concurrency level it
+runs `orchestrate_evaluation` directly and through `POST /evaluate`, then writes
+the results to benchmarks/results/<timestamp>-<commit>.json.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --sizes small,medium --concurrency 1,8 --llm-delay 0.2
+    python benchmarks/run.py --baseline benchmarks/results/<older run>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# name -> (file count, bytes per file)
+REPO_SIZES = {
+    "small": (20, 2_000),
+    "medium": (200, 4_000),
+    "huge": (2_000, 8_000),
+}
+TARGETS = ("orchestrate", "api")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True)
+        return sha.stdout.strip() or "unknown", bool(dirty.stdout.strip())
+    except OSError:
+        return "unknown", False
+
+
+def start_fake_github(latency_ms, timeout=30.0):
+    """Run benchmarks/fake_github.py in its own process; returns (process, base url)."""
+    port = _free_port()
+    env = dict(os.environ, FAKE_GITHUB_LATENCY_MS=str(latency_ms))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.fake_github:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            urllib.request.urlopen(f"{base_url}/repos/bench/files-1-size-1/commits/main", timeout=1)
+            return server, base_url
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError("Fake GitHub server did not start")
+
+
+def configure_env(github_url, data_dir, fetch_backend="api"):
+    """Point the app at the fake GitHub, and switch off caches and rate limits."""
+    os.environ.update({
+        "GITHUB_API_URL": github_url,
+        "REPO_FETCH_BACKEND": fetch_backend,
+        # The graphql backend needs a token; the fake server accepts any
+        "PAT": os.getenv("PAT") or "benchmark",
+        "REPO_CACHE_MAX_MB": "0",
+        "LLM_CACHE_MAX_ENTRIES": "0",
+        "LLM_RPM": "1000000",
+        "LLM_BURST": "1000000",
+        "GITHUB_RPM": "1000000000",
+        "GITHUB_BURST": "1000000",
+        "RESULTS_DB_PATH": os.path.join(data_dir, "results.sqlite3"),
+        "RESULTS_IMPORT_CSV": os.path.join(data_dir, "none.csv"),
+        "JOB_STORE_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+        "BATCH_WORKERS": "0",
+    })
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "mean": round(statistics.fmean(ordered), 4),
+        "p50": round(ordered[len(ordered) // 2], 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+async def run_level(call, repo_url, concurrency, total, trace_memory):
+    """Run `total` evaluations, at most `concurrency` at a time."""
+    latencies, errors = [], []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await call(repo_url)
+            except Exception as e:
+                errors.append(str(e))
+                return
+            latencies.append(time.perf_counter() - start)
+
+    if trace_memory:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    wall = time.perf_counter() - start
+
+    result = {
+        "concurrency": concurrency,
+        "evaluations": total,
+        "errors": len(errors),
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(len(latencies) / wall, 4) if wall else None,
+        "latency_s": summarize(latencies) if latencies else None,
+        "peak_memory_mb": None,
+    }
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        result["peak_memory_mb"] = round((peak - baseline) / 2**20, 2)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+async def run_suite(args):
+    import httpx
+    import app as app_module
+    from agents.combined_agent import CATEGORIES
+    from benchmarks.fake_llm import install_fake_llm
+    from utils.github_utils import fetch_repo_snapshot_async
+
+    install_fake_llm(CATEGORIES, delay=args.llm_delay)
+    if args.trace_memory:
+        tracemalloc.start()
+
+    # use_cache=False: re-evaluating the same repo must not carry scores over (see utils.incremental)
+    async def orchestrate(repo_url):
+        await app_module.orchestrate_evaluation(repo_url, use_cache=False, mode=args.mode)
+
+    scenarios = []
+    async with app_module.app.router.lifespan_context(app_module.app):
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+            async def post_evaluate(repo_url):
+                resp = await client.post("/evaluate", json={"repo_url": repo_url, "mode": args.mode, "no_cache": True})
+                resp.raise_for_status()
+
+            calls = {"orchestrate": orchestrate, "api": post_evaluate}
+            for size in args.sizes:
+                files, file_bytes = REPO_SIZES[size]
+                repo_url = f"https://github.com/bench/files-{files}-size-{file_bytes}"
+
+                # Make sure the fake serves what we expect before timing anything
+                snapshot = await fetch_repo_snapshot_async(repo_url)
+                if snapshot.error or len(snapshot.files) != files + 1:
+                    raise RuntimeError(f"Fake GitHub returned {len(snapshot.files)} files for {size}: {snapshot.error}")
+
+                for target in args.targets:
+                    for concurrency in args.concurrency:
+                        total = max(concurrency * args.rounds, args.min_evaluations)
+                        result = await run_level(calls[target], repo_url, concurrency, total, args.trace_memory)
+                        result = {"target": target, "size": size, "files": files, "file_bytes": file_bytes, **result}
+                        scenarios.append(result)
+                        print_row(result)
+    return scenarios
+
+
+def print_row(result):
+    latency = result["latency_s"] or {}
+    memory = result["peak_memory_mb"]
+    print(
+        f"{result['target']:<12} {result['size']:<7} c={result['concurrency']:<3} "
+        f"n={result['evaluations']:<4} p50={latency.get('p50', float('nan')):7.3f}s "
+        f"p95={latency.get('p95', float('nan')):7.3f}s {result['throughput_per_s'] or 0:7.2f}/s "
+        + (f"peak={memory:8.1f}MB " if memory is not None else "")
+        + (f"errors={result['errors']}" if result["errors"] else "")
+    )
+
+
+def compare(scenarios, baseline_path):
+    """Print p50 latency and throughput against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = {
+            (s["target"], s["size"], s["concurrency"]): s for s in json.load(f)["scenarios"]
+        }
+    print(f"\nCompared with {baseline_path}:")
+    for s in scenarios:
+        old = baseline.get((s["target"], s["size"], s["concurrency"]))
+        if not old or not old["latency_s"] or not s["latency_s"]:
+            continue
+        p50 = s["latency_s"]["p50"] / old["latency_s"]["p50"]
+        throughput = (s["throughput_per_s"] or 0) / (old["throughput_per_s"] or 1)
+        print(f"{s['target']:<12} {s['size']:<7} c={s['concurrency']:<3} p50 x{p50:.2f}  throughput x{throughput:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="small,medium,huge", help=f"comma-separated, from {list(REPO_SIZES)}")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"comma-separated, from {list(TARGETS)}")
+    parser.add_argument("--mode", choices=["per_agent", "combined"], default="per_agent")
+    parser.add_argument("--fetch-backend", choices=["api", "graphql"], default="api")
+    parser.add_argument("--rounds", type=int, default=1, help="evaluations per level = concurrency x rounds")
+    parser.add_argument("--min-evaluations", type=int, default=3)
+    parser.add_argument("--github-latency-ms", type=float, default=20.0, help="delay of every fake GitHub request")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="seconds each fake LLM call takes")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="skip tracemalloc (it slows Python down, so latencies are only comparable "
+                             "between runs with the same setting)")
+    parser.add_argument("--out", default=os.path.join(ROOT, "benchmarks", "results"))
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+    args.sizes = [s for s in args.sizes.split(",") if s]
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c]
+    args.targets = [t for t in args.targets.split(",") if t]
+    for size in args.sizes:
+        if size not in REPO_SIZES:
+            parser.error(f"unknown size {size}")
+    for target in args.targets:
+        if target not in TARGETS:
+            parser.error(f"unknown target {target}")
+
+    commit, dirty = _git_commit()
+    started_at = datetime.now()
+    server, github_url = start_fake_github(args.github_latency_ms)
+    try:
+        configure_env(github_url, tempfile.mkdtemp(prefix="bench_"), args.fetch_backend)
+        scenarios = asyncio.run(run_suite(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "mode": args.mode,
+            "fetch_backend": args.fetch_backend,
+            "github_latency_ms": args.github_latency_ms,
+            "llm_delay_s": args.llm_delay,
+            "trace_memory": args.trace_memory,
+            "rounds": args.rounds,
+            "github_max_concurrency": os.getenv("GITHUB_MAX_CONCURRENCY", "8"),
+            "max_concurrent_evaluations": os.getenv("MAX_CONCURRENT_EVALUATIONS", "16"),
+            "prompt_token_budget": os.getenv("PROMPT_TOKEN_BUDGET", "120000"),
+        },
+        "scenarios": scenarios,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{started_at:%Y%m%d-%H%M%S}-{commit}{'-dirty' if dirty else ''}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📊 Results written to {path}")
+
+    if args.baseline:
+        compare(scenarios, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
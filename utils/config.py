@@ -0,0 +1,23 @@
+import threading
+
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def load_env():
+    """
+    Read .env into os.environ, once per process.
+
+    Every entry point (API lifespan, batch workers, CLI helpers) calls this
+    before reading its settings; after the first call it is a no-op instead of
+    re-parsing the file on every evaluation.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
+
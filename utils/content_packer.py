@@ -0,0 +1,213 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from utils import metrics
+from utils.github_utils import pick_readme
+
+# Files ranked by how much they tell each category agent. Each rule is
+# (regex on the path, relevance); the first matching rule wins.
+_README = r"(^|/)readme[^/]*$"
+_DEPS = r"(^|/)(requirements[^/]*\.txt|environment\.ya?ml|setup\.py|pyproject\.toml|pipfile)$"
+_TESTS = r"(^|/)(tests?/|test_[^/]*\.py$|[^/]*_test\.py$)"
+_DOCS = r"(^|/)docs?/"
+
+RELEVANCE_RULES = {
+    "Innovation": [(_README, 100), (r"\.md$", 80), (r"\.ipynb$", 60), (r"\.py$", 50), (_DEPS, 30)],
+    "Technical": [(_DEPS, 100), (_TESTS, 95), (r"\.py$", 90), (r"\.ipynb$", 60), (r"\.ya?ml$", 50), (r"\.md$", 30)],
+    "Feasibility": [(_DEPS, 100), (r"\.py$", 85), (_README, 80), (r"\.ya?ml$", 60), (r"\.ipynb$", 60), (r"\.md$", 50)],
+    "Impact": [(_README, 100), (r"\.md$", 80), (r"\.py$", 50), (r"\.ipynb$", 45), (_DEPS, 40)],
+    "Presentation": [(_README, 100), (_DOCS, 90), (r"\.md$", 85), (r"\.ipynb$", 50), (r"\.py$", 30)],
+    # Combined mode: one prompt has to serve every category
+    None: [(_README, 100), (_DEPS, 90), (r"\.md$", 75), (r"\.py$", 75), (r"\.ipynb$", 55), (r"\.ya?ml$", 40)],
+}
+DEFAULT_RELEVANCE = 10
+
+# Don't bother keeping less than this much of a truncated file
+MIN_TRUNCATED_TOKENS = 200
+
+
+@dataclass
+class PackedContent:
+    """
+    Prompt text for one agent, bounded by a token budget.
+
+    Attributes:
+        text (str): Content to send as {repo_content}
+        tokens (int): Token count of `text`
+        budget (int): Budget it was packed to
+        included (list): Paths included in full
+        truncated (list): Paths included only partially
+        dropped (list): Paths left out to stay within the budget
+    """
+    text: str
+    tokens: int
+    budget: int
+    included: list = field(default_factory=list)
+    truncated: list = field(default_factory=list)
+    dropped: list = field(default_factory=list)
+
+    def summary(self):
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "included": len(self.included),
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+        }
+
+
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """
+    tiktoken encoding used to approximate Gemini token counts, built once per process.
+    Returns None when it cannot be loaded (e.g. offline); counts then fall back to ~4 chars/token.
+    """
+    # Agents pack concurrently; make sure only one of them loads the encoding
+    with _encoding_lock:
+        return _load_encoding()
+
+
+@lru_cache(maxsize=1)
+def _load_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")  # Recommended default for Gemini
+    except Exception as e:
+        print(f"⚠️ tiktoken unavailable ({e}); estimating tokens from characters")
+        return None
+
+
+def count_tokens(text):
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text, max_tokens):
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def relevance(path, category):
+    for pattern, score in RELEVANCE_RULES.get(category, RELEVANCE_RULES[None]):
+        if re.search(pattern, path, re.IGNORECASE):
+            return score
+    return DEFAULT_RELEVANCE
+
+
+def _file_tokens(snapshot):
+    """Token count per file, computed once per snapshot and shared by all agents."""
+    # Agents pack in parallel threads; only the first one pays for tokenizing.
+    # The lock is the snapshot's own, so other evaluations are not held up.
+    with snapshot.token_lock:
+        if not snapshot.token_counts:
+            snapshot.token_counts = {
+                path: count_tokens(text) for path, text in snapshot.contents.items() if text is not None
+            }
+    return snapshot.token_counts
+
+
+def pack_snapshot(snapshot, category=None, budget=None):
+    """
+    Pack a snapshot into prompt text for one category, within a token budget.
+
+    Files are ranked by relevance to the category (e.g. README/markdown first for
+    Presentation, code and requirements first for Technical), then by depth and
+    size. They are added in that order while they fit. The first file that does
+    not fit is truncated to the space left (if at least MIN_TRUNCATED_TOKENS) and
+    everything after it is dropped. The README is capped at half the budget and
+    is not repeated as a file.
+
+    Args:
+        snapshot (RepoSnapshot): Fetched repository
+        category (str): Category key ("Innovation", "Technical", ...) or None for combined mode
+        budget (int): Max tokens (default PROMPT_TOKEN_BUDGET or 120000)
+    Returns:
+        PackedContent (also remembered in snapshot.packed[category])
+    """
+    budget = budget or int(os.getenv("PROMPT_TOKEN_BUDGET", "120000"))
+    if category in snapshot.packed and snapshot.packed[category].budget == budget:
+        return snapshot.packed[category]
+
+    label = category or "combined"
+    with metrics.timed(metrics.PACK_SECONDS, category=label) as elapsed:
+        packed = _pack(snapshot, category, budget)
+    breakdown = metrics.current_breakdown()
+    if breakdown is not None:
+        breakdown["pack_s"][label] = round(elapsed["seconds"], 4)
+    return packed
+
+
+def _pack(snapshot, category, budget):
+    if snapshot.error:
+        text = snapshot.combined_content()
+        packed = PackedContent(text=text, tokens=count_tokens(text), budget=budget)
+        snapshot.packed[category] = packed
+        return packed
+
+    readme = snapshot.readme
+    readme_tokens = count_tokens(readme)
+    truncated = []
+    if readme_tokens > budget // 2:
+        readme = truncate_to_tokens(readme, budget // 2) + "\n... [README truncated]"
+        readme_tokens = count_tokens(readme)
+        truncated.append("README")
+
+    header = f"README:\n{readme}\n\nPython Code Snippets:\n"
+    remaining = budget - readme_tokens - count_tokens("README:\n\n\nPython Code Snippets:\n")
+
+    readme_path = pick_readme(snapshot.files)
+    file_tokens = _file_tokens(snapshot)
+    ranked = sorted(
+        (path for path in snapshot.files if path != readme_path),
+        key=lambda p: (-relevance(p, category), p.count("/"), file_tokens.get(p, 0), p),
+    )
+
+    included, dropped, code_snippets = [], [], []
+    for path in ranked:
+        code_content = snapshot.contents.get(path)
+        if code_content is None:
+            snippet = f"# File: {path} could not be fetched\n"
+            cost = count_tokens(snippet)
+        else:
+            snippet = f"# File: {path}\n{code_content}\n"
+            cost = file_tokens[path] + count_tokens(f"# File: {path}\n\n") + 1
+
+        if cost <= remaining:
+            code_snippets.append(snippet)
+            included.append(path)
+            remaining -= cost
+        elif code_content is not None and remaining >= MIN_TRUNCATED_TOKENS:
+            keep = remaining - count_tokens(f"# File: {path}\n\n... [truncated]\n") - 1
+            code_snippets.append(f"# File: {path}\n{truncate_to_tokens(code_content, keep)}\n... [truncated]\n")
+            truncated.append(path)
+            remaining = 0
+        else:
+            dropped.append(path)
+
+    if dropped:
+        code_snippets.append(f"# {len(dropped)} lower-priority files omitted to fit the token budget\n")
+
+    text = header + "\n".join(code_snippets)
+    packed = PackedContent(
+        text=text,
+        tokens=count_tokens(text),
+        budget=budget,
+        included=included,
+        truncated=truncated,
+        dropped=dropped,
+    )
+    snapshot.packed[category] = packed
+    print(
+        f"📐 Packed {category or 'all categories'}: {packed.tokens}/{budget} tokens, "
+        f"{len(included)} files, {len(truncated)} truncated, {len(dropped)} dropped"
+    )
+    return packed
@@ -1,73 +1,514 @@
-import requests
-import tiktoken
-import requests
+import asyncio
+import json
+import threading
+import time
+import httpx
+from dataclasses import dataclass, field
 
 
 def estimate_gemini_tokens(text: str) -> int:
     """
     Estimate token count for Gemini model (approximation using tiktoken).
+    Kept for callers outside the agents; they use utils.content_packer directly.
     """
-    # Gemini uses BPE tokenizer similar to OpenAI
-    encoding = tiktoken.get_encoding("cl100k_base")  # Recommended default for Gemini
-    tokens = encoding.encode(text)
-    print(f"Token count for prompt: {len(tokens)}")
+    from utils.content_packer import count_tokens
+    tokens = count_tokens(text)
+    print(f"Token count for prompt: {tokens}")
+    return tokens
 
-# Example
 
-def fetch_github_content(repo_url):
+@dataclass
+class RepoSnapshot:
     """
-    Fetch README + top Python files content from a public GitHub repo.
+    Everything the agents need from a repository, fetched once per evaluation.
+
+    Attributes:
+        repo_url (str): GitHub repo URL the snapshot was taken from
+        commit_sha (str): Commit the tree and files were read at ("" if unknown)
+        readme (str): README text ("README not found" if missing)
+        files (list): Paths of the files selected for evaluation
+        contents (dict): path -> file text, None for files that could not be fetched
+        skipped (dict): path -> why an allowed file was not read (see utils.ingest)
+        blob_shas (dict): path -> git blob SHA for every file in the tree (when known)
+        token_counts (dict): path -> token count, filled by utils.content_packer
+        packed (dict): category -> PackedContent, filled by utils.content_packer
+        token_lock (threading.Lock): Guards token_counts while agents pack in parallel
+        error (str): Set when the fetch failed; the agents then see the error text
+    """
+    repo_url: str
+    commit_sha: str = ""
+    readme: str = "README not found"
+    files: list = field(default_factory=list)
+    contents: dict = field(default_factory=dict)
+    blob_shas: dict = field(default_factory=dict)
+    skipped: dict = field(default_factory=dict)
+    token_counts: dict = field(default_factory=dict, repr=False)
+    packed: dict = field(default_factory=dict, repr=False)
+    error: str = None
+    token_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def combined_content(self):
+        """Build the prompt text the agents have always received."""
+        if self.error:
+            return f"Error fetching repo: {self.error}"
+
+        code_snippets = []
+        for path in self.files:
+            code_content = self.contents.get(path)
+            if code_content is not None:
+                code_snippets.append(f"# File: {path}\n{code_content}\n")
+            else:
+                code_snippets.append(f"# File: {path} could not be fetched\n")
+
+        return f"README:\n{self.readme}\n\nPython Code Snippets:\n" + "\n".join(code_snippets)
+
+
+# Define allowed file types for evaluation
+ALLOWED_EXTENSIONS = (".py", ".ipynb", ".md", ".json", ".yaml", ".yml", ".txt")
+
+# Backends fetch_github_content can pull a repository with
+FETCH_BACKENDS = ("api", "graphql", "clone", "tarball")
+
+# Rough cap on the file bytes requested in one GraphQL query (GITHUB_GRAPHQL_CHUNK caps the file count)
+GRAPHQL_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def github_api_url():
+    """REST API root, from GITHUB_API_URL (GitHub Enterprise, or the fake server in benchmarks/)."""
+    import os
+    return os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+
+def local_mirror_path(repo_url):
+    """
+    The directory `repo_url` names under LOCAL_REPO_ROOT, or None.
+
+    Repo URLs come from API clients, so a path is only read from disk if it
+    resolves (symlinks and ".." included) to an existing directory inside the
+    configured mirror root. Without LOCAL_REPO_ROOT no local paths are read,
+    and anything else is treated as a GitHub URL.
+    """
+    import os
+    root = os.getenv("LOCAL_REPO_ROOT")
+    if not root or "://" in repo_url:
+        return None
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, repo_url))
+    if path == root or os.path.commonpath([root, path]) != root or not os.path.isdir(path):
+        return None
+    return path
+
+
+def parse_repo_url(repo_url):
+    """Return (owner, repo) from https://github.com/<owner>/<repo>."""
+    parts = repo_url.rstrip("/").split("/")
+    owner, repo = parts[-2], parts[-1]
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    return owner, repo
+
+
+def is_allowed_file(path):
+    return path.endswith(ALLOWED_EXTENSIONS)
+
+
+def pick_readme(paths):
+    """Root-level README the way GitHub's /readme endpoint would pick it."""
+    readmes = sorted(p for p in paths if "/" not in p and p.lower().startswith("readme"))
+    if "README.md" in readmes:
+        return "README.md"
+    return readmes[0] if readmes else None
+
+
+# HTTP statuses worth retrying; anything else is returned to the caller as-is
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def github_endpoint(url):
+    """Metrics label for a GitHub API URL: "commits", "trees", "contents", "readme", "tarball", "graphql" or "other"."""
+    for marker, name in (("/commits/", "commits"), ("/git/trees/", "trees"), ("/contents/", "contents"),
+                         ("/tarball/", "tarball"), ("/readme", "readme"), ("/graphql", "graphql")):
+        if marker in url:
+            return name
+    return "other"
+
+
+def is_quota_exhausted(resp):
+    """A 403/429 because the rate limit quota is used up (primary or secondary limit)."""
+    if resp.status_code not in (403, 429):
+        return False
+    return resp.headers.get("x-ratelimit-remaining") == "0" or "retry-after" in resp.headers
+
+
+async def _send_capped(client, method, url, max_bytes, **kwargs):
+    """Send a request but read at most max_bytes + 1 bytes of the body (enough to tell it was cut)."""
+    request = client.build_request(method, url, **kwargs)
+    resp = await client.send(request, stream=True)
+    body = bytearray()
+    try:
+        async for chunk in resp.aiter_bytes():
+            body += chunk
+            if len(body) > max_bytes:
+                break
+    finally:
+        await resp.aclose()
+    # The body is already decoded; drop the headers that describe the encoded one
+    headers = [(k, v) for k, v in resp.headers.multi_items() if k not in ("content-encoding", "content-length")]
+    return httpx.Response(resp.status_code, headers=headers, content=bytes(body[:max_bytes + 1]), request=request)
+
+
+async def _request_with_retry(client, method, url, semaphore, resource="core", retries=3, backoff=0.5,
+                              max_bytes=None, **kwargs):
+    """
+    Send a request through the shared client, at most `semaphore` in flight,
+    paced by the process-wide GitHub rate limiter and quota scheduler.
+    Retries transport errors/timeouts and RETRY_STATUSES with exponential backoff;
+    a request refused for an exhausted quota is retried once the quota resets.
+    With max_bytes, the body is read only up to that size (see _send_capped).
+
+    Raises:
+        GitHubRateLimitError: the quota resets later than GITHUB_QUOTA_MAX_WAIT
+    """
+    from utils.rate_limiter import get_github_quota, get_github_rate_limiter
+    from utils.metrics import record_github_request
+    limiter = get_github_rate_limiter()
+    quota = get_github_quota()
+    endpoint = github_endpoint(url)
+    for attempt in range(retries + 1):
+        try:
+            await quota.acquire_async(resource)
+            async with semaphore:
+                await limiter.acquire_async()
+                start = time.perf_counter()
+                try:
+                    if max_bytes is None:
+                        resp = await client.request(method, url, **kwargs)
+                    else:
+                        resp = await _send_capped(client, method, url, max_bytes, **kwargs)
+                except httpx.TransportError:
+                    record_github_request(endpoint, "error", 0, time.perf_counter() - start)
+                    raise
+            record_github_request(endpoint, resp.status_code, len(resp.content), time.perf_counter() - start)
+            if resp.status_code == 304:
+                # Conditional requests answered 304 are free; update() below must not keep them counted
+                quota.refund(resource)
+            quota.update(resp.headers, resource)
+            if resp.status_code != 429 and not is_quota_exhausted(resp):
+                # Not throttled: the next 429 starts the backoff from the beginning again
+                limiter.success()
+            if is_quota_exhausted(resp) and attempt < retries:
+                retry_after = resp.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    # Secondary limit: slow down every evaluation, not just this one
+                    limiter.backoff(float(retry_after))
+                # Otherwise the quota scheduler now knows it is empty and waits for the reset
+                continue
+            if resp.status_code not in RETRY_STATUSES or attempt == retries:
+                return resp
+            if resp.status_code == 429:
+                limiter.backoff()
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        await asyncio.sleep(backoff * (2 ** attempt))
+
+
+async def _get_with_retry(client, url, semaphore, retries=3, backoff=0.5, max_bytes=None, **kwargs):
+    """GET through _request_with_retry."""
+    return await _request_with_retry(
+        client, "GET", url, semaphore, retries=retries, backoff=backoff, max_bytes=max_bytes, **kwargs
+    )
+
+
+async def _get_conditional(get, cache, url, **kwargs):
+    """
+    GET with If-None-Match from the ETag stored in the repo cache. GitHub does
+    not count a 304 against the quota; it is answered from the stored body as
+    a 200 response. Fresh 200 responses are stored with their ETag.
+    """
+    if not cache:
+        return await get(url, **kwargs)
+    headers = dict(kwargs.pop("headers", None) or {})
+    key = json.dumps([url, kwargs.get("params"), headers.get("Accept"), kwargs.get("max_bytes")])
+    stored = await asyncio.to_thread(cache.get_etag, key)
+    if stored:
+        headers["If-None-Match"] = stored["etag"]
+    resp = await get(url, headers=headers, **kwargs)
+    if resp.status_code == 304 and stored:
+        return httpx.Response(200, text=stored["body"], headers={"ETag": stored["etag"]}, request=resp.request)
+    if resp.status_code == 200 and resp.headers.get("ETag"):
+        await asyncio.to_thread(cache.put_etag, key, resp.headers["ETag"], resp.text)
+    return resp
+
+
+async def fetch_repo_snapshot_async(repo_url, backend=None, max_concurrency=None):
+    """
+    Fetch README, file tree and file contents of a repo in one pass.
 
     Args:
-        repo_url (str): GitHub repo URL (https://github.com/<owner>/<repo>)
-        max_files (int): Max number of Python files to fetch
-        max_chars (int): Max characters per file to include
+        repo_url (str): GitHub repo URL (https://github.com/<owner>/<repo>),
+            or a local directory / bare repository path under LOCAL_REPO_ROOT
+        backend (str): "api" (per-file contents API), "graphql" (many files per
+            GraphQL query), "clone" (shallow git clone) or "tarball" (one archive
+            download); default REPO_FETCH_BACKEND or "api"
+        max_concurrency (int): Max requests in flight for the "api" and "graphql" backends
     Returns:
-        str: Combined string of README + code snippets
+        RepoSnapshot: snapshot to share between all agents of one evaluation
+    Raises:
+        GitHubRateLimitError: GitHub's quota is used up for longer than GITHUB_QUOTA_MAX_WAIT.
+            Other failures are reported in RepoSnapshot.error instead.
     """
+    from utils.config import load_env
+    import os
+    load_env()
+    backend = backend or os.getenv("REPO_FETCH_BACKEND", "api")
+
+    from utils import metrics
+    # Local mirrors never touch the network
+    local_path = local_mirror_path(repo_url)
+    if local_path:
+        backend = "local"
+    with metrics.timed(metrics.FETCH_SECONDS, backend=backend) as elapsed:
+        snapshot = await _fetch_with_backend(repo_url, backend, max_concurrency, local_path)
+    breakdown = metrics.current_breakdown()
+    if breakdown is not None:
+        breakdown["fetch_s"] = round(elapsed["seconds"], 4)
+    return snapshot
+
+
+async def _fetch_with_backend(repo_url, backend, max_concurrency, local_path=None):
+    if backend == "local":
+        from utils.repo_sources import load_local_snapshot
+        return await asyncio.to_thread(load_local_snapshot, local_path, repo_url)
+    if backend == "clone":
+        from utils.repo_sources import clone_snapshot
+        return await asyncio.to_thread(clone_snapshot, repo_url)
+    if backend == "tarball":
+        from utils.repo_sources import fetch_tarball_snapshot
+        return await fetch_tarball_snapshot(repo_url)
+    if backend not in ("api", "graphql"):
+        return RepoSnapshot(repo_url=repo_url, error=f"Unknown fetch backend: {backend}")
+
+    return await _fetch_api_snapshot(repo_url, max_concurrency=max_concurrency, graphql=backend == "graphql")
+
+
+def github_graphql_url():
+    """GraphQL endpoint next to the REST API root (GitHub Enterprise serves it at /api/graphql)."""
+    api_url = github_api_url()
+    if api_url.endswith("/api/v3"):
+        return api_url[: -len("/v3")] + "/graphql"
+    return f"{api_url}/graphql"
+
+
+def _graphql_chunks(blobs, max_files, max_bytes):
+    """Split [(path, sha, size)] into chunks of at most max_files files and ~max_bytes."""
+    chunk, chunk_bytes = [], 0
+    for path, sha, size in blobs:
+        if chunk and (len(chunk) >= max_files or chunk_bytes + (size or 0) > max_bytes):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append((path, sha))
+        chunk_bytes += size or 0
+    if chunk:
+        yield chunk
+
+
+async def _fetch_blobs_graphql(post, owner, repo, blobs, max_files, max_bytes, keep):
+    """
+    Download blob texts by SHA, many per GraphQL query, the queries running concurrently.
+
+    Args:
+        post: async (query, variables) -> the response's "data" (None on failure)
+        blobs (list): [(path, blob_sha, size)]
+        keep: async (path, text) -> what to return for a downloaded text
+    Returns:
+        dict: path -> keep(path, text), None for blobs the query did not return
+    """
+    async def fetch_chunk(chunk):
+        fields = " ".join(
+            f'f{i}: object(oid: "{sha}") {{ ... on Blob {{ text isTruncated }} }}' for i, (_, sha) in enumerate(chunk)
+        )
+        query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+        data = await post(query, {"owner": owner, "name": repo})
+        found = (data or {}).get("repository") or {}
+        texts = {}
+        for i, (path, _) in enumerate(chunk):
+            blob = found.get(f"f{i}") or {}
+            text = None if blob.get("isTruncated") else blob.get("text")
+            texts[path] = await keep(path, text) if text is not None else None
+        return texts
+
+    texts = {}
+    for chunk_texts in await asyncio.gather(*(fetch_chunk(c) for c in _graphql_chunks(blobs, max_files, max_bytes))):
+        texts.update(chunk_texts)
+    return texts
+
+
+async def _fetch_api_snapshot(repo_url, max_concurrency=None, graphql=False):
+    """
+    API backend. The commit, tree and README come from the REST API, as
+    conditional requests when an ETag is stored. Files are downloaded
+    concurrently through one pooled client, at most `max_concurrency`
+    (GITHUB_MAX_CONCURRENCY or 8) requests at a time: one contents request per
+    file, or with graphql=True (needs a PAT) GITHUB_GRAPHQL_CHUNK files per
+    GraphQL query.
+
+    Raises:
+        GitHubRateLimitError: the quota resets later than GITHUB_QUOTA_MAX_WAIT
+    """
+    from utils.rate_limiter import GitHubRateLimitError
+
+    snapshot = RepoSnapshot(repo_url=repo_url)
     try:
-        from dotenv import load_dotenv
         import os
-        load_dotenv()
         GITHUB_TOKEN = os.getenv("PAT")
-        headers = {
-            "Accept": "application/vnd.github.v3.raw",
-            "Authorization": f"token {GITHUB_TOKEN}"
-        }
-        parts = repo_url.rstrip("/").split("/")
-        owner, repo = parts[-2], parts[-1]
-        base_api = f"https://api.github.com/repos/{owner}/{repo}"
-
-        # Fetch README
-        readme_resp = requests.get(f"{base_api}/readme", headers=headers)
-        readme_text = readme_resp.text if readme_resp.status_code == 200 else "README not found"
-
-        # Fetch file tree
-        tree_resp = requests.get(f"{base_api}/git/trees/main?recursive=1", headers=headers)
-        tree_json = tree_resp.json() if tree_resp.status_code == 200 else {}
-
-        # Define allowed file types for evaluation
-        allowed_extensions = (".py", ".ipynb", ".md", ".json", ".yaml", ".yml", ".txt")
-
-        # Filter relevant files
-        eval_files = [
-            item["path"]
-            for item in tree_json.get("tree", [])
-            if item["type"] == "blob" and item["path"].endswith(allowed_extensions)
-        ]
-
-        # Fetch content of Python files
-        code_snippets = []
-        for path in eval_files:
-            file_resp = requests.get(f"{base_api}/contents/{path}", headers=headers)
-            if file_resp.status_code == 200:
-                code_content = file_resp.text  # truncate large files
-                code_snippets.append(f"# File: {path}\n{code_content}\n")
+        max_concurrency = max_concurrency or int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+        retries = int(os.getenv("GITHUB_RETRIES", "3"))
+        timeout = httpx.Timeout(float(os.getenv("GITHUB_TIMEOUT", "20")), connect=10.0)
+        headers = {"Accept": "application/vnd.github.v3.raw"}
+        if GITHUB_TOKEN:
+            headers["Authorization"] = f"token {GITHUB_TOKEN}"
+        elif graphql:
+            print("⚠️ The GraphQL API needs a PAT; fetching files one by one instead")
+            graphql = False
+        owner, repo = parse_repo_url(repo_url)
+        base_api = f"{github_api_url()}/repos/{owner}/{repo}"
+
+        from utils.ingest import IngestLimits, cap_text, plan_ingest, prepare_text
+        ingest_limits = IngestLimits.from_env()
+
+        from utils.repo_cache import get_repo_cache
+        cache = get_repo_cache()
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        async with httpx.AsyncClient(headers=headers, timeout=timeout, limits=limits) as client:
+
+            async def get(url, **kwargs):
+                return await _get_with_retry(client, url, semaphore, retries=retries, **kwargs)
+
+            async def post_graphql(query, variables):
+                for attempt in range(retries + 1):
+                    resp = await _request_with_retry(
+                        client, "POST", github_graphql_url(), semaphore, resource="graphql", retries=retries,
+                        json={"query": query, "variables": variables}, headers={"Accept": "application/json"},
+                    )
+                    if resp.status_code != 200:
+                        return None
+                    body = resp.json()
+                    errors = body.get("errors") or []
+                    if any(error.get("type") == "RATE_LIMITED" for error in errors) and attempt < retries:
+                        # The quota scheduler has seen the empty quota in the headers and waits for the reset
+                        await asyncio.sleep(0.5 * (2 ** attempt))
+                        continue
+                    return body.get("data")
+
+            # Resolve the commit so every file is read from the same tree
+            sha_resp = await _get_conditional(
+                get, cache, f"{base_api}/commits/main", headers={"Accept": "application/vnd.github.sha"}
+            )
+            snapshot.commit_sha = sha_resp.text.strip() if sha_resp.status_code == 200 else ""
+            ref = snapshot.commit_sha or "main"
+
+            # Fetch file tree (a commit's tree never changes, so it can come from the cache)
+            blobs = await asyncio.to_thread(cache.get_tree, snapshot.commit_sha) if cache and snapshot.commit_sha else None
+            if blobs is None:
+                tree_resp = await _get_conditional(get, cache, f"{base_api}/git/trees/{ref}", params={"recursive": "1"})
+                tree_json = tree_resp.json() if tree_resp.status_code == 200 else {}
+                blobs = [
+                    {"path": item["path"], "sha": item.get("sha"), "size": item.get("size")}
+                    for item in tree_json.get("tree", [])
+                    if item["type"] == "blob"
+                ]
+                if cache and snapshot.commit_sha and tree_resp.status_code == 200:
+                    await asyncio.to_thread(cache.put_tree, snapshot.commit_sha, blobs)
+
+            # Filter relevant files, and pick the ones to download from their sizes alone
+            selected, snapshot.skipped = plan_ingest(
+                ((item["path"], item.get("size")) for item in blobs if is_allowed_file(item["path"])), ingest_limits
+            )
+            snapshot.files = [item["path"] for item in blobs if item["path"] in selected]
+            snapshot.blob_shas = {item["path"]: item["sha"] for item in blobs if item.get("sha")}
+            sizes = {item["path"]: item.get("size") for item in blobs}
+
+            # README.md is both the README and an evaluated file; download it once
+            readme_path = pick_readme(snapshot.blob_shas)
+            if readme_path and (sizes.get(readme_path) or 0) > ingest_limits.max_file_bytes:
+                # Too large to read whole; /readme below reads only up to the cap
+                readme_path = None
+            wanted = snapshot.files + ([readme_path] if readme_path and readme_path not in selected else [])
+
+            async def keep(path, text, downloaded=True):
+                blob_sha = snapshot.blob_shas.get(path)
+                if downloaded and cache and blob_sha:
+                    await asyncio.to_thread(cache.put_blob, blob_sha, text)
+                # Strip notebook outputs and cap the text before it is kept for the evaluation
+                return prepare_text(path, text, ingest_limits)
+
+            async def from_cache(path):
+                blob_sha = snapshot.blob_shas.get(path)
+                text = await asyncio.to_thread(cache.get_blob, blob_sha) if cache and blob_sha else None
+                return await keep(path, text, downloaded=False) if text is not None else None
+
+            async def download_file(path):
+                try:
+                    file_resp = await get(f"{base_api}/contents/{path}", params={"ref": ref})
+                except httpx.HTTPError:
+                    return None
+                return await keep(path, file_resp.text) if file_resp.status_code == 200 else None
+
+            texts = dict(zip(wanted, await asyncio.gather(*(from_cache(path) for path in wanted))))
+            missing = [path for path in wanted if texts[path] is None]
+            if graphql and missing:
+                chunk_files = int(os.getenv("GITHUB_GRAPHQL_CHUNK", "50"))
+                texts.update(await _fetch_blobs_graphql(
+                    post_graphql, owner, repo,
+                    [(path, snapshot.blob_shas[path], sizes.get(path)) for path in missing if path in snapshot.blob_shas],
+                    chunk_files, GRAPHQL_CHUNK_BYTES, keep,
+                ))
+                # Anything the GraphQL API did not return (e.g. truncated blobs) comes from the contents API
+                missing = [path for path in missing if texts.get(path) is None]
+            if missing:
+                texts.update(zip(missing, await asyncio.gather(*(download_file(path) for path in missing))))
+
+            snapshot.contents = {path: texts.get(path) for path in snapshot.files}
+            if readme_path and texts.get(readme_path) is not None:
+                snapshot.readme = texts[readme_path]
             else:
-                code_snippets.append(f"# File: {path} could not be fetched\n")
+                # README outside the repo root (docs/, .github/), or too large: let GitHub find it
+                readme_resp = await _get_conditional(
+                    get, cache, f"{base_api}/readme", params={"ref": ref}, max_bytes=ingest_limits.max_file_bytes
+                )
+                if readme_resp.status_code == 200:
+                    snapshot.readme = cap_text(readme_resp.text, ingest_limits.max_file_bytes)
 
-        combined_content = f"README:\n{readme_text}\n\nPython Code Snippets:\n" + "\n".join(code_snippets)
-        return combined_content
+            if cache:
+                print(f"📁 Repo cache: {cache.stats}")
 
+    except GitHubRateLimitError:
+        raise
     except Exception as e:
-        return f"Error fetching repo: {str(e)}"
+        snapshot.error = str(e)
+
+    return snapshot
+
+
+def fetch_repo_snapshot(repo_url, backend=None):
+    """Blocking wrapper around fetch_repo_snapshot_async."""
+    return asyncio.run(fetch_repo_snapshot_async(repo_url, backend=backend))
+
+
+def fetch_github_content(repo_url, backend=None):
+    """
+    Fetch README + top Python files content from a public GitHub repo.
+
+    Args:
+        repo_url (str): GitHub repo URL (https://github.com/<owner>/<repo>),
+            or a local directory / bare repository path under LOCAL_REPO_ROOT
+        backend (str): "api", "graphql", "clone" or "tarball" (see fetch_repo_snapshot_async)
+    Returns:
+        str: Combined string of README + code snippets ("Error fetching repo: ..." if the fetch failed)
+    Raises:
+        GitHubRateLimitError: GitHub's quota is used up; retry after `retry_after` seconds
+    """
+    return fetch_repo_snapshot(repo_url, backend=backend).combined_content()
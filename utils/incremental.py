@@ -0,0 +1,48 @@
+import hashlib
+import json
+
+# How many changed paths to list in a report (the counts are always complete)
+MAX_LISTED_CHANGES = 50
+
+
+def diff_trees(old, new):
+    """
+    Compare two {path: blob_sha} trees.
+
+    Returns:
+        dict: {"added": [...], "removed": [...], "changed": [...]} (sorted paths)
+    """
+    return {
+        "added": sorted(path for path in new if path not in old),
+        "removed": sorted(path for path in old if path not in new),
+        "changed": sorted(path for path in new if path in old and old[path] != new[path]),
+    }
+
+
+def summarize_diff(diff):
+    """Counts plus the first MAX_LISTED_CHANGES paths of each kind, for reports."""
+    summary = {}
+    for kind, paths in diff.items():
+        summary[kind] = len(paths)
+        summary[f"{kind}_paths"] = paths[:MAX_LISTED_CHANGES]
+    return summary
+
+
+def input_fingerprint(packed, config):
+    """
+    Hash of everything an agent's score depends on: `config` (model, rubric,
+    prompt version, ...) and the packed prompt text itself, so any change to
+    what the agent would read (README, any included or truncated file, the
+    budget) re-runs it. Two evaluations with the same fingerprint for a
+    category would ask the agent the same thing, so the earlier score can be
+    carried over.
+
+    Args:
+        packed (PackedContent): The category's packed prompt content
+        config: Anything JSON-serializable that must match for a score to be reused
+    """
+    payload = json.dumps(
+        {"config": config, "budget": packed.budget, "text": hashlib.sha256(packed.text.encode("utf-8")).hexdigest()},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,160 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+
+from utils.content_packer import relevance
+
+# Vendored, generated and lock files: often huge, and they say nothing about the team's own work
+GENERATED_PATTERNS = [
+    r"(^|/)(node_modules|bower_components|dist|build|site-packages|\.?venv|env|__pycache__|\.ipynb_checkpoints"
+    r"|\.tox|\.mypy_cache|\.pytest_cache|\.idea|\.vscode)/",
+    r"(^|/)(package-lock\.json|npm-shrinkwrap\.json|pnpm-lock\.yaml|composer\.lock|pipfile\.lock|poetry\.lock"
+    r"|yarn\.lock|uv\.lock|cargo\.lock|gemfile\.lock)$",
+    r"\.min\.(js|css|json)$",
+]
+
+# How many skipped paths to list in a report (the counts are always complete)
+MAX_LISTED_SKIPPED = 50
+
+
+@dataclass
+class IngestLimits:
+    """
+    Size limits for reading a repository into a snapshot.
+
+    Attributes:
+        max_file_bytes (int): Larger files are not read; text longer than this is cut
+        max_notebook_bytes (int): Limit for .ipynb files before their outputs are stripped
+        max_total_bytes (int): Ceiling on all file text kept for one evaluation
+    """
+    max_file_bytes: int
+    max_notebook_bytes: int
+    max_total_bytes: int
+
+    @classmethod
+    def from_env(cls):
+        """From INGEST_MAX_FILE_KB (256), INGEST_MAX_NOTEBOOK_KB (4096) and INGEST_MAX_TOTAL_MB (16)."""
+        return cls(
+            max_file_bytes=int(float(os.getenv("INGEST_MAX_FILE_KB", "256")) * 1024),
+            max_notebook_bytes=int(float(os.getenv("INGEST_MAX_NOTEBOOK_KB", "4096")) * 1024),
+            max_total_bytes=int(float(os.getenv("INGEST_MAX_TOTAL_MB", "16")) * 1024 * 1024),
+        )
+
+
+def is_notebook(path):
+    return path.lower().endswith(".ipynb")
+
+
+def skip_reason(path, size, limits):
+    """Why a file should not be read at all ("generated", "too large"), or None."""
+    if any(re.search(pattern, path, re.IGNORECASE) for pattern in GENERATED_PATTERNS):
+        return "generated"
+    limit = limits.max_notebook_bytes if is_notebook(path) else limits.max_file_bytes
+    if size is not None and size > limit:
+        return "too large"
+    return None
+
+
+def plan_ingest(entries, limits):
+    """
+    Pick the files to read from their sizes alone, before reading any of them.
+
+    Files are taken by relevance (README, requirements, docs and code first),
+    then depth and size, while the per-evaluation ceiling allows. Each one
+    counts for at most max_file_bytes, since that is all that is kept of it.
+
+    Args:
+        entries: iterable of (path, size in bytes or None if unknown)
+        limits (IngestLimits)
+    Returns:
+        (set of paths to read, {skipped path: reason})
+    """
+    entries = sorted(entries, key=lambda e: (-relevance(e[0], None), e[0].count("/"), e[1] or 0, e[0]))
+    remaining = limits.max_total_bytes
+    selected, skipped = set(), {}
+    for path, size in entries:
+        reason = skip_reason(path, size, limits)
+        if reason:
+            skipped[path] = reason
+            continue
+        cost = limits.max_file_bytes if size is None else min(size, limits.max_file_bytes)
+        if cost > remaining:
+            skipped[path] = "over total limit"
+            continue
+        selected.add(path)
+        remaining -= cost
+    return selected, skipped
+
+
+def strip_notebook(text):
+    """
+    Reduce a notebook to its code and markdown cells, dropping outputs (plots
+    are base64 images) and metadata. Returns None if it is not valid notebook JSON.
+    """
+    try:
+        notebook = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(notebook, dict):
+        return None
+    cells = notebook.get("cells")
+    if cells is None:  # nbformat 3
+        cells = [cell for sheet in notebook.get("worksheets", []) for cell in sheet.get("cells", [])]
+    parts = []
+    for cell in cells:
+        source = cell.get("source", cell.get("input", ""))
+        if isinstance(source, list):
+            source = "".join(source)
+        if cell.get("cell_type") == "code":
+            parts.append(f"# %%\n{source}")
+        elif cell.get("cell_type") == "markdown":
+            parts.append(f"# %% [markdown]\n{source}")
+    return "\n\n".join(parts)
+
+
+def cap_text(text, max_bytes):
+    """Cut text to at most max_bytes of UTF-8 (plus a marker)."""
+    if len(text) * 4 <= max_bytes:  # can't be over, whatever the characters
+        return text
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", errors="ignore") + "\n... [file truncated]\n"
+
+
+def prepare_text(path, text, limits):
+    """File text as it goes into a snapshot: notebooks stripped of outputs, then capped."""
+    if is_notebook(path):
+        stripped = strip_notebook(text)
+        if stripped is not None:
+            text = stripped
+    return cap_text(text, limits.max_file_bytes)
+
+
+def iter_documents(paths, read, limits):
+    """
+    Read and prepare files one at a time, yielding (path, text or None).
+    Only one raw file is held in memory at a time.
+
+    Args:
+        paths: paths to read, in order
+        read: path -> bytes (OSError if it cannot be read)
+    """
+    for path in paths:
+        try:
+            data = read(path)
+        except OSError:
+            yield path, None
+            continue
+        text = data.decode("utf-8", errors="replace")
+        del data
+        yield path, prepare_text(path, text, limits)
+
+
+def summarize_skipped(skipped):
+    """Counts per reason plus the first MAX_LISTED_SKIPPED paths, for reports."""
+    counts = {}
+    for reason in skipped.values():
+        counts[reason] = counts.get(reason, 0) + 1
+    return {"count": len(skipped), "reasons": counts, "paths": sorted(skipped)[:MAX_LISTED_SKIPPED]}
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+from utils.rate_limiter import GitHubRateLimitError
+
+# Job lifecycle: queued -> running -> done | failed (back to queued if GitHub's quota runs out)
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobStore:
+    """
+    SQLite-backed queue of batch evaluation jobs, so queued and finished jobs
+    survive a restart of the API.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    batch_id TEXT NOT NULL,
+                    repo_url TEXT NOT NULL,
+                    team_name TEXT NOT NULL DEFAULT '',
+                    mode TEXT,
+                    use_cache INTEGER NOT NULL DEFAULT 1,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs(batch_id)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row, with_result=False):
+        job = {
+            "job_id": row["id"],
+            "batch_id": row["batch_id"],
+            "repo_url": row["repo_url"],
+            "team_name": row["team_name"],
+            "mode": row["mode"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if with_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+    def create_batch(self, items, mode=None, use_cache=True):
+        """
+        Queue one job per item.
+
+        Args:
+            items (list): dicts with "repo_url" and optional "team_name"
+        Returns:
+            (batch_id, list of job dicts)
+        """
+        batch_id = uuid.uuid4().hex
+        now = time.time()
+        rows = [
+            (uuid.uuid4().hex, batch_id, item["repo_url"], item.get("team_name") or "", mode,
+             int(use_cache), QUEUED, now + i * 1e-6)
+            for i, item in enumerate(items)
+        ]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO jobs (id, batch_id, repo_url, team_name, mode, use_cache, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        return batch_id, [self.get(row[0]) for row in rows]
+
+    def claim_next(self):
+        """Atomically move the oldest queued job to running and return it (None if the queue is empty)."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, time.time(), row["id"]),
+            )
+            conn.execute("COMMIT")
+        job = self._to_dict(row)
+        job["use_cache"] = bool(row["use_cache"])
+        return job
+
+    def finish(self, job_id, result=None, error=None):
+        status = FAILED if error is not None else DONE
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+            )
+
+    def requeue(self, job_id, error=None):
+        """Put a job back in the queue, e.g. after GitHub's quota ran out; `error` says why."""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = ?, error = ? WHERE id = ?", (QUEUED, error, job_id))
+
+    def requeue_running(self):
+        """Put jobs interrupted by a restart back in the queue; returns how many."""
+        with self._connect() as conn:
+            cur = conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+            return cur.rowcount
+
+    def get(self, job_id, with_result=False):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row, with_result) if row else None
+
+    def list_batch(self, batch_id):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at", (batch_id,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+
+class BatchWorkerPool:
+    """
+    A fixed number of asyncio worker tasks draining a JobStore.
+
+    Every worker awaits `evaluate(repo_url, use_cache=..., mode=..., team_name=...)`;
+    all of them share the process-wide GitHub and Gemini rate limiters, so adding
+    workers raises throughput only as far as those budgets allow. Must be started
+    and used from the event loop that serves the API.
+    """
+
+    def __init__(self, store, evaluate, workers=4, poll_interval=2.0):
+        self.store = store
+        self.evaluate = evaluate
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = None
+        self._tasks = []
+
+    def start(self):
+        requeued = self.store.requeue_running()
+        if requeued:
+            print(f"🔁 Requeued {requeued} interrupted batch jobs")
+        self._wakeup = asyncio.Event()
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._run(), name=f"batch-worker-{i}"))
+
+    async def stop(self):
+        # Jobs cut off here stay "running" and are requeued by the next start()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after new jobs were queued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            job = await asyncio.to_thread(self.store.claim_next)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            print(f"📋 Batch job {job['job_id']}: {job['repo_url']}")
+            try:
+                report = await self.evaluate(
+                    job["repo_url"], use_cache=job["use_cache"], mode=job["mode"], team_name=job["team_name"]
+                )
+                await asyncio.to_thread(self.store.finish, job["job_id"], result=report)
+            except asyncio.CancelledError:
+                raise
+            except GitHubRateLimitError as e:
+                # Not the repo's fault: retry it, with everything else, once the quota resets
+                await asyncio.to_thread(self.store.requeue, job["job_id"], error=str(e))
+                print(f"⏸️ {e}; batch worker pausing {e.retry_after:.0f}s")
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                await asyncio.to_thread(self.store.finish, job["job_id"], error=str(e))
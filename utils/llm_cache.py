@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+def make_cache_key(model, category, rubric, rubric_version, prompt_template, repo_content):
+    """
+    Key an LLM response by everything that can change it: model, rubric text and
+    version, the prompt template and a hash of the packed repository content.
+    """
+    content_hash = hashlib.sha256(repo_content.encode("utf-8")).hexdigest()
+    payload = json.dumps(
+        [model, category, rubric, rubric_version, prompt_template, content_hash],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite store of raw agent responses.
+
+    Entries older than `ttl_seconds` are ignored and purged; once more than
+    `max_entries` are stored the least recently used ones are deleted.
+    """
+
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    category TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commit on success, rollback on error
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+            return row[0]
+
+    def put(self, key, response, model="", category=""):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, category, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, category, response, now, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "  SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Process-wide LLMCache, configured from LLM_CACHE_PATH (default .cache/llm_cache.sqlite3),
+    LLM_CACHE_TTL_HOURS (default 168) and LLM_CACHE_MAX_ENTRIES (default 5000).
+    Returns None when LLM_CACHE_MAX_ENTRIES=0.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+            if max_entries <= 0:
+                return None
+            path = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+            ttl_seconds = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+            _cache = LLMCache(path, ttl_seconds, max_entries)
+        return _cache
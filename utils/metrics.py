@@ -0,0 +1,161 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans a single GitHub request up to a slow multi-minute evaluation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines += self._render_values()
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic total, e.g. requests or tokens."""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_values(self):
+        return [f"{self.name}{self._labels(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies), in cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # [count per bucket, sum, count]
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _render_values(self):
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{self._labels(key, [('le', f'{bound:g}')])} {bucket_count}")
+            lines.append(f"{self.name}_bucket{self._labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {total:.6f}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+REGISTRY = []
+
+GITHUB_REQUESTS = Counter("github_requests_total", "GitHub API requests", ["endpoint", "status"])
+GITHUB_BYTES = Counter("github_response_bytes_total", "Bytes received from the GitHub API", ["endpoint"])
+GITHUB_REQUEST_SECONDS = Histogram("github_request_seconds", "Latency of one GitHub API request", ["endpoint"])
+GITHUB_QUOTA_WAIT_SECONDS = Counter(
+    "github_quota_wait_seconds_total", "Time requests waited for GitHub's rate limit quota", ["resource"]
+)
+FETCH_SECONDS = Histogram("repo_fetch_seconds", "Time to fetch a whole repository snapshot", ["backend"])
+PACK_SECONDS = Histogram("content_pack_seconds", "Time to pack a snapshot into one prompt", ["category"])
+LLM_SECONDS = Histogram("llm_call_seconds", "Latency of one agent's LLM call, retries included", ["agent"])
+LLM_INPUT_TOKENS = Counter("llm_input_tokens_total", "Prompt tokens sent to the LLM", ["agent"])
+LLM_OUTPUT_TOKENS = Counter("llm_output_tokens_total", "Tokens generated by the LLM", ["agent"])
+LLM_RETRIES = Counter("llm_retries_total", "LLM calls retried after a rate limit error", ["agent"])
+LLM_CACHE_HITS = Counter("llm_cache_hits_total", "Agent answers served from the LLM cache", ["agent"])
+LLM_PARSE_FAILURES = Counter("llm_parse_failures_total", "Agent answers that were not valid JSON", ["agent"])
+EVALUATION_SECONDS = Histogram("evaluation_seconds", "Total time of one evaluation", ["mode"])
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# Per-evaluation timing breakdown. Set by the orchestrator; tasks and threads
+# started during the evaluation inherit it, so every stage reports into it.
+_breakdown = contextvars.ContextVar("evaluation_breakdown", default=None)
+
+
+def start_breakdown():
+    """Start collecting the timing breakdown of the evaluation running in this context."""
+    breakdown = {
+        "total_s": None,
+        "fetch_s": None,
+        "github": {"requests": 0, "bytes": 0, "seconds": 0.0},
+        "pack_s": {},
+        "agents": {},
+    }
+    _breakdown.set(breakdown)
+    return breakdown
+
+
+def current_breakdown():
+    return _breakdown.get()
+
+
+def agent_breakdown(agent):
+    """The breakdown entry of one agent in the current evaluation (None outside an evaluation)."""
+    breakdown = _breakdown.get()
+    if breakdown is None:
+        return None
+    return breakdown["agents"].setdefault(
+        agent, {"seconds": None, "input_tokens": None, "output_tokens": None, "retries": 0, "cached": False}
+    )
+
+
+def record_github_request(endpoint, status, nbytes, seconds):
+    GITHUB_REQUESTS.inc(endpoint=endpoint, status=status)
+    GITHUB_BYTES.inc(nbytes, endpoint=endpoint)
+    GITHUB_REQUEST_SECONDS.observe(seconds, endpoint=endpoint)
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        github = breakdown["github"]
+        github["requests"] += 1
+        github["bytes"] += nbytes
+        github["seconds"] = round(github["seconds"] + seconds, 4)
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe how long the block took; yields a dict whose "seconds" is set on exit."""
+    elapsed = {"seconds": None}
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed["seconds"] = time.perf_counter() - start
+        histogram.observe(elapsed["seconds"], **labels)
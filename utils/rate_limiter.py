@@ -0,0 +1,236 @@
+import asyncio
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every caller of one API.
+
+    `rate_per_minute` tokens are added per minute up to `burst`; acquire() blocks
+    until a token is free. When the API answers 429, backoff() pauses all callers
+    (not only the one that was throttled) and the pause doubles on repeated 429s.
+    """
+
+    def __init__(self, rate_per_minute, burst=1, base_backoff=2.0, max_backoff=60.0):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def _try_acquire(self):
+        """Take a token if possible; otherwise return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate_per_second
+
+    def acquire(self):
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waits without blocking the event loop."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def backoff(self, retry_after=None):
+        """Pause every caller after a 429; returns the pause in seconds."""
+        with self._lock:
+            self._strikes += 1
+            delay = retry_after or min(self.max_backoff, self.base_backoff * (2 ** (self._strikes - 1)))
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._tokens = 0.0
+            return delay
+
+    def success(self):
+        """Reset the backoff after a call went through."""
+        with self._lock:
+            self._strikes = 0
+
+
+class GitHubRateLimitError(Exception):
+    """GitHub's quota is used up and resets later than GITHUB_QUOTA_MAX_WAIT allows waiting for."""
+
+    def __init__(self, resource, reset_at):
+        self.resource = resource
+        self.reset_at = reset_at
+        super().__init__(
+            f"GitHub {resource} rate limit exhausted until {time.strftime('%H:%M:%S', time.localtime(reset_at))}"
+        )
+
+    @property
+    def retry_after(self):
+        """Seconds until the quota resets."""
+        return max(0.0, self.reset_at - time.time())
+
+
+class QuotaScheduler:
+    """
+    Paces GitHub requests by the quota GitHub reports in its X-RateLimit-*
+    headers, per resource ("core" for REST, "graphql", ...), across every
+    in-flight evaluation and batch job.
+
+    While more than `pace_fraction` of the quota is left, requests go straight
+    through. Below that, they are spread evenly over the time left until the
+    quota resets. Once only `reserve` requests are left, every caller waits
+    for the reset, or gets GitHubRateLimitError if that is more than
+    `max_wait` seconds away. The reserve is at most a tenth of the reported
+    limit, so small quotas (60 an hour without a token) remain usable.
+    """
+
+    def __init__(self, reserve=50, pace_fraction=0.2, max_wait=3600.0):
+        self.reserve = reserve
+        self.pace_fraction = pace_fraction
+        self.max_wait = max_wait
+        self._quota = {}  # resource -> {"limit", "remaining", "reset"} (reset: epoch seconds)
+        self._next_slot = {}
+        self._announced = {}  # resource -> reset time of the last pause that was printed
+        self._lock = threading.Lock()
+
+    def update(self, headers, resource="core"):
+        """Record the quota from a response's X-RateLimit-* headers (ignored if absent)."""
+        try:
+            limit = int(headers["x-ratelimit-limit"])
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset = float(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        resource = headers.get("x-ratelimit-resource") or resource
+        with self._lock:
+            quota = self._quota.get(resource)
+            if quota is None or reset > quota["reset"]:
+                # First response, or a new quota window
+                self._quota[resource] = {"limit": limit, "remaining": remaining, "reset": reset}
+            else:
+                # Responses arrive out of order; requests counted in _reserve() may not show yet
+                quota["remaining"] = min(quota["remaining"], remaining)
+
+    def refund(self, resource="core"):
+        """Give back the request _reserve() counted, for responses GitHub does not charge (304)."""
+        with self._lock:
+            quota = self._quota.get(resource)
+            if quota is not None:
+                quota["remaining"] = min(quota["limit"], quota["remaining"] + 1)
+
+    def _reserve(self, resource):
+        """Count one request against the quota; returns (seconds to wait, reserved, announce pause)."""
+        with self._lock:
+            quota = self._quota.get(resource)
+            now = time.time()
+            if quota is None:
+                return 0.0, True, False
+            if now >= quota["reset"]:
+                # The window is over; the next response reports the new quota
+                del self._quota[resource]
+                return 0.0, True, False
+            reserve = min(self.reserve, quota["limit"] // 10)
+            if quota["remaining"] <= reserve:
+                wait = quota["reset"] - now + 1
+                if wait > self.max_wait:
+                    raise GitHubRateLimitError(resource, quota["reset"])
+                announce = self._announced.get(resource) != quota["reset"]
+                self._announced[resource] = quota["reset"]
+                return wait, False, announce
+            wait = 0.0
+            if quota["remaining"] < quota["limit"] * self.pace_fraction:
+                # Spread what is left over the rest of the window, counted from this request's slot
+                slot = max(now, self._next_slot.get(resource, 0.0))
+                self._next_slot[resource] = slot + (quota["reset"] - slot) / (quota["remaining"] - reserve)
+                wait = slot - now
+            quota["remaining"] -= 1
+            return wait, True, False
+
+    async def acquire_async(self, resource="core"):
+        """Wait until a request against `resource` fits the quota (see class docstring)."""
+        from utils import metrics
+
+        while True:
+            wait, reserved, announce = self._reserve(resource)
+            if wait > 0:
+                if announce:
+                    print(f"⏸️ GitHub {resource} quota exhausted, pausing {wait:.0f}s until it resets")
+                metrics.GITHUB_QUOTA_WAIT_SECONDS.inc(wait, resource=resource)
+                await asyncio.sleep(wait)
+            if reserved:
+                return
+
+    def status(self):
+        """{resource: {"limit", "remaining", "reset"}} as last seen."""
+        with self._lock:
+            return {resource: dict(quota) for resource, quota in self._quota.items()}
+
+
+def is_rate_limit_error(error):
+    """True for 429 / quota errors raised by the Gemini client."""
+    text = f"{type(error).__name__} {error}"
+    return "ResourceExhausted" in text or "429" in text or "quota" in text.lower()
+
+
+_llm_limiter = None
+_github_limiter = None
+_github_quota = None
+_limiter_lock = threading.Lock()
+
+
+def get_llm_rate_limiter():
+    """Process-wide limiter for Gemini calls, from LLM_RPM (default 15) and LLM_BURST (default 5)."""
+    global _llm_limiter
+    with _limiter_lock:
+        if _llm_limiter is None:
+            _llm_limiter = RateLimiter(
+                rate_per_minute=float(os.getenv("LLM_RPM", "15")),
+                burst=int(os.getenv("LLM_BURST", "5")),
+            )
+        return _llm_limiter
+
+
+def get_github_rate_limiter():
+    """
+    Process-wide limiter for GitHub API calls, shared by every evaluation and batch job.
+    From GITHUB_RPM (default 900, GitHub's secondary limit) and GITHUB_BURST (default 100).
+    """
+    global _github_limiter
+    with _limiter_lock:
+        if _github_limiter is None:
+            _github_limiter = RateLimiter(
+                rate_per_minute=float(os.getenv("GITHUB_RPM", "900")),
+                burst=int(os.getenv("GITHUB_BURST", "100")),
+            )
+        return _github_limiter
+
+
+def get_github_quota():
+    """
+    Process-wide QuotaScheduler for GitHub, from GITHUB_QUOTA_RESERVE (default 50
+    requests kept back) and GITHUB_QUOTA_MAX_WAIT (default 3600 seconds).
+    """
+    global _github_quota
+    with _limiter_lock:
+        if _github_quota is None:
+            _github_quota = QuotaScheduler(
+                reserve=int(os.getenv("GITHUB_QUOTA_RESERVE", "50")),
+                max_wait=float(os.getenv("GITHUB_QUOTA_MAX_WAIT", "3600")),
+            )
+        return _github_quota
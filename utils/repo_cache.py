@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class RepoCache:
+    """
+    Content-addressed on-disk cache for repository fetches.
+
+    Tree listings are stored by commit SHA and file bodies by git blob SHA, so an
+    unchanged repo (or a fork sharing most blobs) only needs the missing blobs.
+    Responses to mutable requests (a branch's head commit, a README) are kept
+    with their ETag, so they can be revalidated with a conditional request.
+    The cache is bounded to `max_bytes`; the least recently used entries are
+    evicted first (file mtime is bumped on every hit).
+
+    Layout:
+        <root>/trees/<commit_sha>.json
+        <root>/blobs/<sha[:2]>/<sha>
+        <root>/etags/<sha1(key)[:2]>/<sha1(key)>.json
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stats = {"tree_hits": 0, "tree_misses": 0, "blob_hits": 0, "blob_misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._size = None  # computed lazily from disk
+
+    # --- paths ---
+    def _tree_path(self, commit_sha):
+        return os.path.join(self.root, "trees", f"{commit_sha}.json")
+
+    def _blob_path(self, blob_sha):
+        return os.path.join(self.root, "blobs", blob_sha[:2], blob_sha)
+
+    def _etag_path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "etags", digest[:2], f"{digest}.json")
+
+    # --- reads ---
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return data
+
+    def get_tree(self, commit_sha):
+        """Return the cached blob list [{"path", "sha", "size"}] for a commit, or None."""
+        data = self._read(self._tree_path(commit_sha)) if commit_sha else None
+        with self._lock:
+            self.stats["tree_hits" if data is not None else "tree_misses"] += 1
+        return json.loads(data) if data is not None else None
+
+    def get_blob(self, blob_sha):
+        """Return the cached text of a blob, or None."""
+        data = self._read(self._blob_path(blob_sha)) if blob_sha else None
+        with self._lock:
+            self.stats["blob_hits" if data is not None else "blob_misses"] += 1
+        return data.decode("utf-8") if data is not None else None
+
+    def get_etag(self, key):
+        """Return the stored {"etag", "body"} of a request (see put_etag), or None."""
+        data = self._read(self._etag_path(key))
+        return json.loads(data) if data is not None else None
+
+    # --- writes ---
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            size = self._current_size()
+            if os.path.exists(path):
+                size -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._size = size + len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def put_tree(self, commit_sha, blobs):
+        if commit_sha:
+            self._write(self._tree_path(commit_sha), json.dumps(blobs).encode("utf-8"))
+
+    def put_blob(self, blob_sha, text):
+        if blob_sha:
+            self._write(self._blob_path(blob_sha), text.encode("utf-8"))
+
+    def put_etag(self, key, etag, body):
+        """Remember a response body and its ETag; `key` identifies the request (URL, params, Accept)."""
+        self._write(self._etag_path(key), json.dumps({"etag": etag, "body": body}).encode("utf-8"))
+
+    # --- eviction ---
+    def _entries(self):
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _current_size(self):
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        target = self.max_bytes * 0.9
+        for path, size, _ in sorted(self._entries(), key=lambda e: e[2]):
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                os.remove(path)
+            self._size = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_repo_cache():
+    """
+    Process-wide RepoCache, configured from REPO_CACHE_DIR (default .cache/repos)
+    and REPO_CACHE_MAX_MB (default 512). Returns None when REPO_CACHE_MAX_MB=0.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            max_mb = float(os.getenv("REPO_CACHE_MAX_MB", "512"))
+            if max_mb <= 0:
+                return None
+            root = os.getenv("REPO_CACHE_DIR", os.path.join(".cache", "repos"))
+            _cache = RepoCache(root, int(max_mb * 1024 * 1024))
+        return _cache
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import os
+import tarfile
+import tempfile
+import time
+
+import httpx
+
+from utils.github_utils import RepoSnapshot, github_api_url, is_allowed_file, parse_repo_url, pick_readme
+from utils.ingest import IngestLimits, iter_documents, plan_ingest
+from utils.metrics import record_github_request
+from utils.rate_limiter import GitHubRateLimitError, get_github_quota
+
+# Tarballs larger than this are spooled to disk while they are read
+TARBALL_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def git_blob_sha(data):
+    """The SHA git (and the GitHub trees API) gives a file with these bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _build_snapshot(repo_url, commit_sha, blobs):
+    """
+    Build a RepoSnapshot from (path, size, read_fn, blob_sha) tuples in tree order.
+    read_fn(n=-1) returns the file's bytes, at most n of them if n >= 0.
+
+    Which files to read is decided from their sizes first (see utils.ingest);
+    README and the selected files are then read one at a time. A README over
+    the per-file limit is read only up to it.
+    """
+    blobs = list(blobs)
+    limits = IngestLimits.from_env()
+    snapshot = RepoSnapshot(repo_url=repo_url, commit_sha=commit_sha)
+    readme_path = pick_readme(path for path, _, _, _ in blobs)
+    selected, snapshot.skipped = plan_ingest(
+        ((path, size) for path, size, _, _ in blobs if is_allowed_file(path)), limits
+    )
+    readers, capped = {}, set()
+    for path, size, read, blob_sha in blobs:
+        if blob_sha:
+            snapshot.blob_shas[path] = blob_sha
+        if path == readme_path or path in selected:
+            readers[path] = read
+        if path == readme_path and path not in selected and (size or 0) > limits.max_file_bytes:
+            capped.add(path)
+
+    def read_and_hash(path):
+        if path in capped:
+            # One byte over the limit, so the text is marked as truncated
+            return readers[path](limits.max_file_bytes + 1)
+        data = readers[path]()
+        # Tarballs and plain directories carry no blob SHAs; use git's so trees can be diffed
+        snapshot.blob_shas.setdefault(path, git_blob_sha(data))
+        return data
+
+    for path, text in iter_documents(readers, read_and_hash, limits):
+        if path == readme_path and text is not None:
+            snapshot.readme = text
+        if path in selected:
+            snapshot.files.append(path)
+            snapshot.contents[path] = text
+    return snapshot
+
+
+def _snapshot_from_git(repo, repo_url):
+    """Read the HEAD commit of a GitPython repo (works for bare repos too)."""
+    commit = repo.head.commit
+    blobs = (
+        (item.path, item.size, lambda n=-1, item=item: item.data_stream.read(n), item.hexsha)
+        for item in commit.tree.traverse()
+        if item.type == "blob"
+    )
+    return _build_snapshot(repo_url, commit.hexsha, blobs)
+
+
+def _snapshot_from_directory(path, repo_url):
+    """Plain directory walk for mirrors that are not git repositories."""
+    blobs = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d != ".git")
+        for name in sorted(names):
+            full_path = os.path.join(root, name)
+            rel_path = os.path.relpath(full_path, path).replace(os.sep, "/")
+
+            def read(n=-1, full_path=full_path):
+                with open(full_path, "rb") as f:
+                    return f.read(n)
+
+            blobs.append((rel_path, os.path.getsize(full_path), read, None))
+    return _build_snapshot(repo_url, "", blobs)
+
+
+def load_local_snapshot(path, repo_url=None):
+    """
+    Snapshot a local checkout, bare repository or plain directory without any network access.
+
+    Args:
+        path (str): Directory on disk
+        repo_url (str): URL to record on the snapshot (defaults to `path`)
+    Returns:
+        RepoSnapshot
+    """
+    repo_url = repo_url or path
+    try:
+        import git
+        try:
+            repo = git.Repo(path)
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+            return _snapshot_from_directory(path, repo_url)
+        with repo:
+            return _snapshot_from_git(repo, repo_url)
+    except Exception as e:
+        return RepoSnapshot(repo_url=repo_url, error=str(e))
+
+
+def clone_snapshot(repo_url):
+    """Shallow-clone (`git clone --depth 1`) the repo into a temp dir and snapshot HEAD."""
+    try:
+        import git
+        from utils.config import load_env
+        load_env()
+        GITHUB_TOKEN = os.getenv("PAT")
+        owner, repo = parse_repo_url(repo_url)
+        auth = f"x-access-token:{GITHUB_TOKEN}@" if GITHUB_TOKEN else ""
+        clone_url = f"https://{auth}github.com/{owner}/{repo}.git"
+
+        with tempfile.TemporaryDirectory(prefix="hackeval-") as tmp_dir:
+            with git.Repo.clone_from(clone_url, tmp_dir, depth=1, single_branch=True) as cloned:
+                return _snapshot_from_git(cloned, repo_url)
+    except Exception as e:
+        return RepoSnapshot(repo_url=repo_url, error=str(e))
+
+
+async def fetch_tarball_snapshot(repo_url, ref="main"):
+    """
+    Download the whole tree as one tarball and snapshot it.
+
+    The archive is streamed to a temporary file (kept in memory only while it
+    is small) rather than held in memory, and only the files utils.ingest
+    selects are extracted from it.
+    """
+    try:
+        GITHUB_TOKEN = os.getenv("PAT")
+        owner, repo = parse_repo_url(repo_url)
+        headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+        timeout = httpx.Timeout(float(os.getenv("GITHUB_TIMEOUT", "20")) * 6, connect=10.0)
+
+        with tempfile.SpooledTemporaryFile(max_size=TARBALL_SPOOL_BYTES) as archive:
+            async with httpx.AsyncClient(headers=headers, timeout=timeout, follow_redirects=True) as client:
+                quota = get_github_quota()
+                await quota.acquire_async()
+                start = time.perf_counter()
+                url = f"{github_api_url()}/repos/{owner}/{repo}/tarball/{ref}"
+                async with client.stream("GET", url) as resp:
+                    if resp.is_success:
+                        async for chunk in resp.aiter_bytes():
+                            archive.write(chunk)
+                    else:
+                        await resp.aread()
+                record_github_request("tarball", resp.status_code, archive.tell(), time.perf_counter() - start)
+                quota.update(resp.headers)
+                resp.raise_for_status()
+            archive.seek(0)
+            return await asyncio.to_thread(_snapshot_from_tarball, archive, repo_url)
+    except GitHubRateLimitError:
+        raise
+    except Exception as e:
+        return RepoSnapshot(repo_url=repo_url, error=str(e))
+
+
+def _snapshot_from_tarball(archive, repo_url):
+    with tarfile.open(fileobj=archive, mode="r:gz") as tar:
+        # GitHub stores the commit SHA as the archive comment
+        members = [member for member in tar if member.isfile()]
+        commit_sha = tar.pax_headers.get("comment", "")
+        blobs = (
+            # Strip the "<owner>-<repo>-<sha>/" prefix
+            (
+                member.name.split("/", 1)[-1], member.size,
+                lambda n=-1, member=member: tar.extractfile(member).read(n), None,
+            )
+            for member in members
+        )
+        return _build_snapshot(repo_url, commit_sha, blobs)
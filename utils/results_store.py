@@ -0,0 +1,228 @@
+import csv
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+CATEGORIES = ("Innovation", "Technical", "Feasibility", "Impact", "Presentation")
+
+# Leaderboard views: every evaluation, the latest one per repository, or the latest one per team
+LEADERBOARD_VIEWS = ("all", "latest_per_repo", "latest_per_team")
+
+
+def normalize_repo_url(repo_url):
+    """Key that treats https://github.com/a/b, .../a/b/ and .../a/b.git as the same repo."""
+    key = repo_url.strip().rstrip("/").lower()
+    if key.endswith(".git"):
+        key = key[:-4]
+    return key
+
+
+class ResultsStore:
+    """
+    Append-only SQLite store of evaluation reports, indexed by repo, commit, team
+    and total score. Replaces rewriting evaluation_results.csv on every save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        score_columns = ",\n".join(f"{c.lower()} INTEGER" for c in CATEGORIES)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS evaluations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    repo_url TEXT NOT NULL,
+                    repo_key TEXT NOT NULL,
+                    commit_sha TEXT NOT NULL DEFAULT '',
+                    team_name TEXT NOT NULL DEFAULT '',
+                    mode TEXT,
+                    total_score REAL NOT NULL,
+                    {score_columns},
+                    details TEXT
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_eval_repo ON evaluations(repo_key, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_eval_commit ON evaluations(commit_sha)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_eval_team ON evaluations(team_name, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_eval_score ON evaluations(total_score DESC)")
+            conn.execute("CREATE TABLE IF NOT EXISTS imports (source TEXT PRIMARY KEY, rows INTEGER, imported_at TEXT)")
+            # Last evaluated tree and per-category inputs of each repo, for incremental re-evaluation
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS repo_state (
+                    repo_key TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    repo_url TEXT NOT NULL,
+                    commit_sha TEXT NOT NULL DEFAULT '',
+                    tree TEXT NOT NULL,
+                    categories TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (repo_key, mode)
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:  # commit on success, rollback on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(created_at, repo_url, commit_sha, team_name, mode, total_score, scores, details):
+        return (
+            created_at, repo_url, normalize_repo_url(repo_url), commit_sha or "", team_name or "", mode,
+            total_score, *(scores.get(c) for c in CATEGORIES), json.dumps(details) if details else None,
+        )
+
+    _INSERT = (
+        "INSERT INTO evaluations (created_at, repo_url, repo_key, commit_sha, team_name, mode, total_score, "
+        + ", ".join(c.lower() for c in CATEGORIES)
+        + ", details) VALUES (" + ", ".join("?" * (8 + len(CATEGORIES))) + ")"
+    )
+
+    def save_report(self, report, team_name=""):
+        """Append one evaluation report (as returned by orchestrate_evaluation); returns its id."""
+        details = report.get("details", {})
+        scores = {c: details.get(c, {}).get("score") for c in CATEGORIES}
+        row = self._row(
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"), report["repository"], report.get("commit_sha"),
+            team_name, report.get("mode"), report.get("total_score", 0), scores, details,
+        )
+        with self._connect() as conn:
+            return conn.execute(self._INSERT, row).lastrowid
+
+    def import_csv(self, csv_path):
+        """
+        One-shot import of the old evaluation_results.csv. A file that was already
+        imported is skipped; returns the number of rows imported.
+        """
+        source = os.path.abspath(csv_path)
+        if not os.path.exists(csv_path):
+            return 0
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM imports WHERE source = ?", (source,)).fetchone():
+                return 0
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                rows = [
+                    self._row(
+                        rec["timestamp"], rec["github_url"], "", rec.get("team_name", ""), None,
+                        float(rec["total_score"] or 0),
+                        {c: int(float(rec[c])) if rec.get(c) else None for c in CATEGORIES}, None,
+                    )
+                    for rec in csv.DictReader(f)
+                ]
+            conn.executemany(self._INSERT, rows)
+            conn.execute(
+                "INSERT INTO imports (source, rows, imported_at) VALUES (?, ?, ?)",
+                (source, len(rows), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+        return len(rows)
+
+    def leaderboard(self, view="all", limit=50, offset=0):
+        """
+        One page of the leaderboard, best total score first.
+
+        Returns:
+            dict: {"view", "total", "limit", "offset", "rows": [...]}
+        """
+        if view not in LEADERBOARD_VIEWS:
+            raise ValueError(f"Unknown leaderboard view: {view}")
+        columns = "id, created_at, repo_url, commit_sha, team_name, mode, total_score, " + ", ".join(
+            c.lower() for c in CATEGORIES
+        )
+        if view == "all":
+            source = "evaluations"
+        else:
+            partition = "repo_key" if view == "latest_per_repo" else "lower(trim(team_name))"
+            where = "" if view == "latest_per_repo" else "WHERE team_name != ''"
+            source = (
+                f"(SELECT *, ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY created_at DESC, id DESC) AS rn "
+                f"FROM evaluations {where}) WHERE rn = 1"
+            )
+            source = f"(SELECT * FROM {source})"
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {columns} FROM {source} ORDER BY total_score DESC, created_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return {"view": view, "total": total, "limit": limit, "offset": offset, "rows": [self._public(r) for r in rows]}
+
+    @staticmethod
+    def _public(row):
+        data = {
+            "id": row["id"],
+            "timestamp": row["created_at"],
+            "github_url": row["repo_url"],
+            "commit_sha": row["commit_sha"],
+            "team_name": row["team_name"],
+            "mode": row["mode"],
+            "total_score": row["total_score"],
+        }
+        for c in CATEGORIES:
+            data[c] = row[c.lower()]
+        return data
+
+    def get(self, evaluation_id):
+        """One stored evaluation including per-category feedback."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM evaluations WHERE id = ?", (evaluation_id,)).fetchone()
+        if row is None:
+            return None
+        data = self._public(row)
+        data["details"] = json.loads(row["details"]) if row["details"] else None
+        return data
+
+
+    def get_repo_state(self, repo_url, mode):
+        """
+        What the last evaluation of this repo (in this mode) saw.
+
+        Returns:
+            dict: {"commit_sha", "tree": {path: blob_sha}, "categories": {name: {"fingerprint", "result"}},
+                   "updated_at"}, or None if the repo was never evaluated
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM repo_state WHERE repo_key = ? AND mode = ?", (normalize_repo_url(repo_url), mode)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "commit_sha": row["commit_sha"],
+            "tree": json.loads(row["tree"]),
+            "categories": json.loads(row["categories"]),
+            "updated_at": row["updated_at"],
+        }
+
+    def save_repo_state(self, repo_url, mode, commit_sha, tree, categories):
+        """Remember the tree and per-category fingerprints/results of the evaluation that just finished."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO repo_state (repo_key, mode, repo_url, commit_sha, tree, categories, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_repo_url(repo_url), mode, repo_url, commit_sha or "", json.dumps(tree),
+                 json.dumps(categories), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+
+
+def get_results_store():
+    from utils.config import load_env
+    load_env()
+    return ResultsStore(os.getenv("RESULTS_DB_PATH", os.path.join("data", "results.sqlite3")))
+
+
+if __name__ == "__main__":
+    # python -m utils.results_store import evaluation_results.csv
+    if len(sys.argv) != 3 or sys.argv[1] != "import":
+        sys.exit("usage: python -m utils.results_store import <csv file>")
+    print(f"Imported {get_results_store().import_csv(sys.argv[2])} rows")